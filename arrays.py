@@ -0,0 +1,53 @@
+# Flat numeric arrays shared by the simulation, the particle system and the
+# training environment. NumPy is optional: with it the arrays are NumPy
+# arrays that the callers update with whole-array operations, without it
+# they are array() buffers of the same typecode.
+#
+# A storage policy decides which of the two a component gets.
+# NumpyStorage is the default when NumPy is installed. ArrayStorage keeps
+# plain array() buffers even then, which is faster for the handful of
+# elements one game usually holds. Check `vectorised` to see which kind of
+# array a policy hands out.
+from array import array
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+class ArrayStorage:
+    # Plain array() storage: float32 ("f") or uint8 ("B") buffers
+    vectorised = False
+
+    def allocate(self, size, typecode="f"):
+        # A zeroed array of size elements
+        return array(typecode, bytes(array(typecode).itemsize * size))
+
+    def grow(self, values):
+        # values with its length doubled (the new tail zeroed)
+        values.extend(self.allocate(len(values), values.typecode))
+        return values
+
+    def grid(self, mask, rows, cols):
+        # A rows x cols view of a bytearray mask for whole-grid queries, or
+        # None when the storage has none
+        return None
+
+class NumpyStorage(ArrayStorage):
+    # NumPy storage: float32 or uint8 arrays, and 2D views of masks
+    vectorised = True
+
+    def allocate(self, size, typecode="f"):
+        return np.zeros(size, dtype=np.float32 if typecode == "f" else np.uint8)
+
+    def grow(self, values):
+        return np.concatenate((values, np.zeros_like(values)))
+
+    def grid(self, mask, rows, cols):
+        return np.frombuffer(mask, dtype=np.uint8).reshape(rows, cols)
+
+DEFAULT_STORAGE = NumpyStorage() if np is not None else ArrayStorage()
+
+def allocate_array(size, typecode="f"):
+    # A zeroed array of the default storage
+    return DEFAULT_STORAGE.allocate(size, typecode)
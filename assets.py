@@ -0,0 +1,105 @@
+# Asset loading: sound effects and music on a background thread, fonts
+# cached by size.
+#
+# The loader starts once the display is up, so the menu is on screen while
+# the sounds load. Until a sound has loaded (or if it fails to) a silent
+# DummySound stands in for it; each asset falls back on its own, so one
+# missing file no longer silences every effect. Every load is timed for
+# the startup report.
+import threading
+import time
+
+import pygame
+
+# Sound effect name -> file
+SOUND_FILES = {
+    "shoot": "shoot.wav",
+    "explosion": "explosion.wav",
+    "powerup": "powerup.wav",
+    "shield": "shield.wav",
+    "speed": "speed.wav",
+    "weapon": "weapon.wav",
+    "life": "life.wav",
+    "levelup": "levelup.wav",
+}
+MUSIC_FILE = "background_music.mp3"
+MUSIC_VOLUME = 0.5
+
+class DummySound:
+    # Silent stand-in for a sound that is missing or not loaded yet
+    def play(self): pass
+
+class AssetManager:
+    def __init__(self):
+        self.fonts = {}  # Size -> default font at that size
+        self.sounds = {name: DummySound() for name in SOUND_FILES}
+        self.load_times = {}  # Asset -> seconds it took to load
+        self.failures = {}  # Asset -> why it could not be loaded
+        self.font_lock = threading.Lock()
+        self.thread = None
+        self.started_at = None
+        self.finished_at = None
+
+    def font(self, size):
+        # The default font at a size, created on first use unless the loader
+        # got to it first
+        with self.font_lock:
+            font = self.fonts.get(size)
+            if font is None:
+                start = time.perf_counter()
+                font = self.fonts[size] = pygame.font.SysFont(None, size)
+                self.load_times[f"font {size}"] = time.perf_counter() - start
+        return font
+
+    def sound(self, name):
+        return self.sounds[name]
+
+    def start(self, font_sizes=(), music=True):
+        # Load the sounds, then the given font sizes and the music, in the
+        # background
+        self.started_at = time.perf_counter()
+        self.thread = threading.Thread(target=self.load_all, args=(font_sizes, music),
+                                       name="asset-loader", daemon=True)
+        self.thread.start()
+
+    def load_all(self, font_sizes, music):
+        for name, path in SOUND_FILES.items():
+            loaded, sound = self.load(path, pygame.mixer.Sound, path)
+            if loaded:
+                self.sounds[name] = sound
+        for size in font_sizes:
+            self.font(size)
+        if music:
+            loaded, _ = self.load(MUSIC_FILE, pygame.mixer.music.load, MUSIC_FILE)
+            if loaded:
+                pygame.mixer.music.set_volume(MUSIC_VOLUME)
+                pygame.mixer.music.play(-1)  # -1 means loop indefinitely
+            else:
+                print("Background music file not found. Continuing without music.")
+        self.finished_at = time.perf_counter()
+
+    def load(self, asset, loader, *args):
+        # Run one timed load; returns (loaded, result), recording why it failed
+        start = time.perf_counter()
+        try:
+            result = loader(*args)
+            loaded = True
+        except (pygame.error, OSError) as error:
+            self.failures[asset] = str(error)
+            result = None
+            loaded = False
+        self.load_times[asset] = time.perf_counter() - start
+        return loaded, result
+
+    def report(self):
+        # Per-asset load times and failures, slowest first
+        lines = []
+        if self.finished_at is not None:
+            lines.append(f"Background loading took {(self.finished_at - self.started_at) * 1000:.1f} ms")
+        else:
+            lines.append("Background loading still running")
+        for asset, seconds in sorted(self.load_times.items(), key=lambda item: -item[1]):
+            failure = self.failures.get(asset)
+            status = f"  (failed: {failure})" if failure else ""
+            lines.append(f"  {asset:<22} {seconds * 1000:>8.2f} ms{status}")
+        return "\n".join(lines)
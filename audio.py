@@ -0,0 +1,96 @@
+# Sound effect playback with voice management.
+#
+# Sound.play() picks any free mixer channel, so a triple-shot volley that
+# clears several aliens at once stacks identical voices, steals channels and
+# clips. The dispatcher plays every effect on its own reserved set of
+# channels instead:
+# - repeats of a sound requested in the same batch are coalesced into one,
+# - each sound has a limit on how many copies play at once; past it, or
+#   when every reserved channel is busy, its oldest voice is cut off and
+#   its channel reused,
+# - a sound with no voice of its own to reuse when every channel is busy
+#   is dropped.
+# Each outcome is counted so the limits can be tuned.
+from collections import deque
+
+import pygame
+
+from assets import DummySound
+
+SOUND_CHANNELS = 12  # Mixer channels reserved for sound effects
+DEFAULT_MAX_VOICES = 2
+# Copies of a sound that may play at once
+SOUND_MAX_VOICES = {
+    "shoot": 3,
+    "explosion": 4,
+    "shield": 2,
+    "powerup": 2,
+    "speed": 1,
+    "weapon": 1,
+    "life": 1,
+    "levelup": 1,
+}
+
+class SoundDispatcher:
+    def __init__(self, assets, channels=SOUND_CHANNELS, max_voices=SOUND_MAX_VOICES):
+        self.assets = assets
+        self.max_voices = max_voices
+        self.pending = {}  # Sounds requested since the last flush (ordered)
+        self.voices = {}  # Sound name -> channels playing it, oldest first
+        self.channels = []
+        if pygame.mixer.get_init():
+            # Reserve the first channels so plain Sound.play() never takes them
+            if pygame.mixer.get_num_channels() < channels:
+                pygame.mixer.set_num_channels(channels)
+            pygame.mixer.set_reserved(channels)
+            self.channels = [pygame.mixer.Channel(i) for i in range(channels)]
+        self.played = 0
+        self.coalesced = 0  # Repeats merged into a play already pending
+        self.stolen = 0  # Plays that cut off an older voice of the same sound
+        self.dropped = 0  # Plays with no channel left to play on or take over
+
+    def play(self, name):
+        # Request a sound; it starts on the next flush()
+        if name in self.pending:
+            self.coalesced += 1
+        else:
+            self.pending[name] = True
+
+    def flush(self):
+        # Start every sound requested since the last flush
+        for name in self.pending:
+            self.start(name)
+        self.pending.clear()
+
+    def start(self, name):
+        sound = self.assets.sound(name)
+        if isinstance(sound, DummySound) or not self.channels:
+            return  # Not loaded (or no audio device): nothing to play
+
+        # Forget voices that have finished (or whose channel was reused)
+        voices = self.voices.setdefault(name, deque())
+        for _ in range(len(voices)):
+            channel = voices.popleft()
+            if channel.get_busy() and channel.get_sound() is sound:
+                voices.append(channel)
+
+        channel = None
+        if len(voices) < self.max_voices.get(name, DEFAULT_MAX_VOICES):
+            channel = next((channel for channel in self.channels if not channel.get_busy()), None)
+        if channel is None:
+            # At the limit, or every channel is busy: cut off this sound's
+            # oldest voice and reuse its channel
+            if not voices:
+                self.dropped += 1
+                return
+            channel = voices.popleft()
+            channel.stop()
+            self.stolen += 1
+        channel.play(sound)
+        voices.append(channel)
+        self.played += 1
+
+    def report(self):
+        return (f"Sound effects: {self.played} played, {self.coalesced} coalesced, "
+                f"{self.stolen} stole an older voice, {self.dropped} dropped "
+                f"({len(self.channels)} channels)")
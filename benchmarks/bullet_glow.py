@@ -0,0 +1,67 @@
+# Per-bullet drawing cost before and after the shared bullet stamps.
+#
+# Usage (from the repository root):
+#     python -m benchmarks.bullet_glow [--frames N]
+import argparse
+import os
+import random
+import time
+
+# Run without a window or audio device
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+
+import render
+from simulation import SCREEN_WIDTH, SCREEN_HEIGHT
+
+screen = None
+
+BULLET_COUNTS = [10, 50, 200, 500]
+
+def draw_bullets_per_surface(bullets, glow_color, bullet_color, inner_color):
+    # The old path: a fresh glow surface and two circles for every bullet
+    for bullet in bullets:
+        bullet_surface = pygame.Surface((14, 14), pygame.SRCALPHA)
+        pygame.draw.circle(bullet_surface, glow_color, (7, 7), 6)
+        screen.blit(bullet_surface, (int(bullet[0]) - 7, int(bullet[1]) - 7))
+        pygame.draw.circle(screen, bullet_color, (int(bullet[0]), int(bullet[1])), 4)
+        pygame.draw.circle(screen, inner_color, (int(bullet[0]), int(bullet[1])), 2)
+
+def draw_bullets_stamped(bullets, glow_color, bullet_color, inner_color):
+    # The new path: one shared stamp and a single batched blit
+    stamp = render.bullet_stamps.get(glow_color, bullet_color, inner_color)
+    radius = render.BULLET_STAMP_RADIUS
+    screen.blits([(stamp, (int(bullet[0]) - radius, int(bullet[1]) - radius))
+                  for bullet in bullets], False)
+
+def time_per_bullet(draw, bullets, frames):
+    colors = ((255, 100, 100, 100), render.RED, render.ORANGE)
+    draw(bullets, *colors)  # Warm up caches
+    start = time.perf_counter()
+    for _ in range(frames):
+        draw(bullets, *colors)
+    elapsed = time.perf_counter() - start
+    return elapsed / (frames * len(bullets)) * 1e6  # Microseconds per bullet
+
+def main_benchmark():
+    global screen
+    parser = argparse.ArgumentParser(description="Benchmark player bullet drawing")
+    parser.add_argument("--frames", type=int, default=200, help="frames to draw per bullet count")
+    args = parser.parse_args()
+
+    pygame.init()
+    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+
+    rng = random.Random(0)
+    print(f"{'bullets':>8} {'before us/bullet':>17} {'after us/bullet':>16} {'speedup':>8}")
+    for count in BULLET_COUNTS:
+        bullets = [[rng.uniform(0, SCREEN_WIDTH), rng.uniform(0, SCREEN_HEIGHT)]
+                   for _ in range(count)]
+        before = time_per_bullet(draw_bullets_per_surface, bullets, args.frames)
+        after = time_per_bullet(draw_bullets_stamped, bullets, args.frames)
+        print(f"{count:>8} {before:>17.2f} {after:>16.2f} {before / after:>7.1f}x")
+
+if __name__ == "__main__":
+    main_benchmark()
@@ -0,0 +1,77 @@
+# Bullet-vs-enemy lookup cost at the maximum 8x12 formation: the old brute
+# force scan against the formation index kept by EnemyGroup.
+#
+# Usage (from the repository root):
+#     python -m benchmarks.collisions [--rounds N]
+import argparse
+import random
+import time
+
+from simulation import ENEMY_SPACING, EnemyGroup
+
+BULLET_COUNTS = [1, 10, 50, 200]
+MAX_ROWS = 8
+MAX_COLS = 12
+
+def enemy_rects(enemy_group):
+    # The live enemies as plain (x, y, width, height) tuples, standing in for
+    # the old list of enemy objects
+    return [(enemy.x, enemy.y, enemy.width, enemy.height) for enemy in enemy_group.enemies]
+
+def hits_brute_force(bullets, enemies):
+    # The old path: copy the enemy list for every bullet and test them all
+    hits = []
+    for bullet in bullets:
+        hit = None
+        for enemy in enemies[:]:
+            x, y, width, height = enemy
+            if (bullet[0] >= x and bullet[0] <= x + width and
+                bullet[1] >= y and bullet[1] <= y + height):
+                hit = enemy
+                break
+        hits.append(hit)
+    return hits
+
+def hits_indexed(bullets, enemy_group):
+    return [enemy_group.enemy_at(bullet[0], bullet[1]) for bullet in bullets]
+
+def time_per_bullet(lookup, bullets, enemies, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        lookup(bullets, enemies)
+    elapsed = time.perf_counter() - start
+    return elapsed / (rounds * len(bullets)) * 1e6  # Microseconds per bullet
+
+def main_benchmark():
+    parser = argparse.ArgumentParser(description="Benchmark bullet-vs-enemy collision lookups")
+    parser.add_argument("--rounds", type=int, default=200, help="lookups per bullet count")
+    args = parser.parse_args()
+
+    enemy_group = EnemyGroup(MAX_ROWS, MAX_COLS)
+
+    # Knock out a few enemies so the grid has holes, as it does mid-wave
+    rng = random.Random(0)
+    for enemy in rng.sample(enemy_group.enemies, 20):
+        enemy_group.kill(enemy)
+
+    left = enemy_group.origin_x - 20
+    top = enemy_group.origin_y - 20
+    right = left + MAX_COLS * ENEMY_SPACING + 40
+    bottom = top + MAX_ROWS * ENEMY_SPACING + 40
+
+    print(f"{MAX_ROWS}x{MAX_COLS} formation, {len(enemy_group.enemies)} live enemies")
+    # Taken once, outside the timing, so the baseline times only the scan
+    enemies = enemy_rects(enemy_group)
+    print(f"{'bullets':>8} {'brute force us/bullet':>22} {'indexed us/bullet':>18} {'speedup':>8}")
+    for count in BULLET_COUNTS:
+        bullets = [(rng.uniform(left, right), rng.uniform(top, bottom)) for _ in range(count)]
+        indexed = [None if enemy is None else (enemy.x, enemy.y, enemy.width, enemy.height)
+                   for enemy in hits_indexed(bullets, enemy_group)]
+        if hits_brute_force(bullets, enemies) != indexed:
+            raise SystemExit("formation index disagrees with the brute force scan")
+        before = time_per_bullet(hits_brute_force, bullets, enemies, args.rounds)
+        after = time_per_bullet(hits_indexed, bullets, enemy_group, args.rounds)
+        print(f"{count:>8} {before:>22.2f} {after:>18.2f} {before / after:>7.1f}x")
+
+if __name__ == "__main__":
+    main_benchmark()
@@ -0,0 +1,57 @@
+# Per-step enemy fire cost at the maximum 8x12 formation: the old dice roll
+# per enemy against the scheduled fire in EnemyGroup.shoot. Both should fire
+# the same number of shots on average.
+#
+# Usage (from the repository root):
+#     python -m benchmarks.enemy_fire [--steps N]
+import argparse
+import random
+import time
+
+from simulation import EnemyGroup
+
+MAX_ROWS = 8
+MAX_COLS = 12
+SHOOT_CHANCES = [0.001, 0.002, 0.004]
+
+def shoot_per_enemy(enemy_group, enemies):
+    # The old path: one random roll for every living enemy every step
+    for x, y, width, height in enemies:
+        if enemy_group.rng.random() < enemy_group.shoot_chance * enemy_group.tick_scale:
+            enemy_group.bullets.add(x + width // 2 - 1.5, y + height)
+
+def shoot_scheduled(enemy_group, enemies):
+    enemy_group.shoot()
+
+def run(shoot, shoot_chance, steps):
+    # Returns (microseconds per step, shots per step)
+    enemy_group = EnemyGroup(MAX_ROWS, MAX_COLS, rng=random.Random(0))
+    enemy_group.shoot_chance = shoot_chance
+    # The live enemies as plain (x, y, width, height) tuples, taken outside
+    # the timing so the per-enemy baseline times only its rolls
+    enemies = [(enemy.x, enemy.y, enemy.width, enemy.height) for enemy in enemy_group.enemies]
+    shots = 0
+    start = time.perf_counter()
+    for _ in range(steps):
+        shoot(enemy_group, enemies)
+        shots += len(enemy_group.bullets)
+        enemy_group.bullets.clear()
+    elapsed = time.perf_counter() - start
+    return elapsed / steps * 1e6, shots / steps
+
+def main_benchmark():
+    parser = argparse.ArgumentParser(description="Benchmark enemy fire per simulation step")
+    parser.add_argument("--steps", type=int, default=100000, help="steps per shoot chance")
+    args = parser.parse_args()
+
+    print(f"{MAX_ROWS}x{MAX_COLS} formation, {MAX_ROWS * MAX_COLS} live enemies")
+    print(f"{'chance':>7} {'per-enemy us/step':>18} {'scheduled us/step':>18} {'speedup':>8} "
+          f"{'shots/step before':>18} {'after':>7}")
+    for shoot_chance in SHOOT_CHANCES:
+        before, before_rate = run(shoot_per_enemy, shoot_chance, args.steps)
+        after, after_rate = run(shoot_scheduled, shoot_chance, args.steps)
+        print(f"{shoot_chance:>7} {before:>18.2f} {after:>18.2f} {before / after:>7.1f}x "
+              f"{before_rate:>18.4f} {after_rate:>7.4f}")
+
+if __name__ == "__main__":
+    main_benchmark()
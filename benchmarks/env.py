@@ -0,0 +1,47 @@
+# Training environment throughput: simulation steps per second for a
+# VectorEnv of growing size in one process, and for a ProcessVectorEnv
+# spread over worker processes, in total and per core. Actions are random.
+#
+# Usage (from the repository root):
+#     python -m benchmarks.env [--steps N] [--workers W]
+import argparse
+import multiprocessing
+import random
+import time
+
+from env import ACTIONS, ProcessVectorEnv, VectorEnv
+
+ENV_COUNTS = [1, 16, 64, 256]
+
+def run(env, steps, seed=0):
+    # Returns (instance steps per second, games finished)
+    rng = random.Random(seed)
+    env.reset(seed)
+    finished = 0
+    start = time.perf_counter()
+    for _ in range(steps):
+        actions = [rng.randrange(ACTIONS) for _ in range(env.num_envs)]
+        _, _, dones = env.step(actions)
+        finished += sum(int(done) for done in dones)
+    elapsed = time.perf_counter() - start
+    env.close()
+    return env.num_envs * steps / elapsed, finished
+
+def main_benchmark():
+    parser = argparse.ArgumentParser(description="Benchmark the batched training environment")
+    parser.add_argument("--steps", type=int, default=2000, help="steps per configuration")
+    parser.add_argument("--workers", type=int, default=multiprocessing.cpu_count(),
+                        help="worker processes for the process pool run")
+    args = parser.parse_args()
+
+    print(f"{'configuration':>36} {'steps/s':>10} {'per core':>10} {'games ended':>12}")
+    for num_envs in ENV_COUNTS:
+        rate, finished = run(VectorEnv(num_envs), args.steps)
+        print(f"{f'VectorEnv({num_envs})':>36} {rate:>10.0f} {rate:>10.0f} {finished:>12}")
+    num_envs = 64 * args.workers
+    rate, finished = run(ProcessVectorEnv(num_envs, workers=args.workers), args.steps)
+    print(f"{f'ProcessVectorEnv({num_envs}, {args.workers} workers)':>36} {rate:>10.0f} "
+          f"{rate / args.workers:>10.0f} {finished:>12}")
+
+if __name__ == "__main__":
+    main_benchmark()
@@ -0,0 +1,46 @@
+# Formation step cost as the grid grows: the old per-enemy position updates
+# against moving the shared formation origin in EnemyGroup.move.
+#
+# Usage (from the repository root):
+#     python -m benchmarks.formation [--steps N]
+import argparse
+import time
+
+from simulation import ENEMY_MOVE_TIME, EnemyGroup
+
+GRID_SIZES = [(5, 10), (8, 12), (32, 48), (100, 100)]
+
+def move_per_enemy(enemy_group, positions):
+    # The old path: every enemy's x is updated on each formation step
+    enemy_group.move()
+    for position in positions:
+        position[0] += enemy_group.speed * enemy_group.direction
+
+def move_origin(enemy_group, positions):
+    enemy_group.move()
+
+def time_per_step(move, rows, cols, steps):
+    enemy_group = EnemyGroup(rows, cols)
+    positions = [[enemy.x, enemy.y] for enemy in enemy_group.enemies]
+    clock = enemy_group.clock
+    start = time.perf_counter()
+    for _ in range(steps):
+        # Make every call a formation step
+        clock.time += ENEMY_MOVE_TIME + 1
+        move(enemy_group, positions)
+    elapsed = time.perf_counter() - start
+    return elapsed / steps * 1e6  # Microseconds per formation step
+
+def main_benchmark():
+    parser = argparse.ArgumentParser(description="Benchmark formation steps against grid size")
+    parser.add_argument("--steps", type=int, default=2000, help="formation steps per grid size")
+    args = parser.parse_args()
+
+    print(f"{'grid':>8} {'enemies':>8} {'per-enemy us/step':>18} {'origin us/step':>15} {'speedup':>8}")
+    for rows, cols in GRID_SIZES:
+        before = time_per_step(move_per_enemy, rows, cols, args.steps)
+        after = time_per_step(move_origin, rows, cols, args.steps)
+        print(f"{f'{rows}x{cols}':>8} {rows * cols:>8} {before:>18.2f} {after:>15.2f} {before / after:>7.1f}x")
+
+if __name__ == "__main__":
+    main_benchmark()
@@ -0,0 +1,186 @@
+# Whole-game throughput in fixed, seeded worst-case scenes, simulation only
+# and simulation plus rendering. Results can be saved as JSON to compare
+# builds.
+#
+# Usage (from the repository root):
+#     python -m benchmarks.scenarios [--ticks N] [--seed S] [--only NAME ...] [--quality TIER]
+#         [--render-scale SCALE] [--renderer {surface,texture}] [--output FILE]
+import argparse
+import json
+import os
+import platform
+import random
+import time
+
+# Run without a window or audio device
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+
+import render
+import simulation
+from quality import QUALITY_NAMES, QUALITY_TIERS
+from simulation import SCREEN_WIDTH, SCREEN_HEIGHT, Game
+from textures import TextureDisplay, TexturePresenter, TextureRenderer, texture_backend_available
+
+FOREVER = float("inf")  # Power-up expiry time that never comes
+MAX_GRID_LEVEL = 25  # First level with the full 8x12 grid (rows cap at 8 when sqrt(level) reaches 5)
+MAX_SHOOT_CHANCE = 0.004  # The cap on ENEMY_SHOOT_CHANCE scaling in Game.level_up
+PARTICLE_TARGET = 500
+
+def advance_to_level(game, level):
+    # Level up the way kills would, so the grid size, enemy speed and
+    # shoot chance all follow the game's own formulas
+    while game.current_level < level:
+        game.level_up()
+    game.drain_events()
+
+def setup_full_grid(game):
+    advance_to_level(game, MAX_GRID_LEVEL)
+
+def setup_triple_shot(game):
+    game.player.has_weapon_upgrade = True
+    game.player.weapon_upgrade_time = FOREVER
+
+def setup_shielded_max_fire(game):
+    advance_to_level(game, MAX_GRID_LEVEL)
+    game.shoot_chance = game.enemy_group.shoot_chance = MAX_SHOOT_CHANCE
+    game.player.has_shield = True
+    game.player.shield_time = FOREVER
+
+def top_up_particles(renderer):
+    # Keep the particle pool at PARTICLE_TARGET live particles
+    rng = renderer.rng
+    particles = renderer.particles
+    style = renderer.explosion_style
+    while len(particles) < PARTICLE_TARGET:
+        particles.emit(rng.uniform(0, SCREEN_WIDTH), rng.uniform(0, SCREEN_HEIGHT),
+                       rng.uniform(1, 4), rng.randint(30, 90), style,
+                       dx=rng.uniform(-2, 2), dy=rng.uniform(-2, 2), shrink=0.03)
+
+# name -> (description, game setup, per-frame renderer hook, fire every N ticks or 0)
+SCENARIOS = {
+    "baseline": ("level 1, sweeping and firing every 10 ticks", None, None, 10),
+    "full_grid": (f"level {MAX_GRID_LEVEL} 8x12 grid, not firing", setup_full_grid, None, 0),
+    "triple_shot": ("triple shot held down every tick", setup_triple_shot, None, 1),
+    "particles": (f"{PARTICLE_TARGET} live particles", None, top_up_particles, 10),
+    "shielded_max_fire": (f"shielded under the level {MAX_GRID_LEVEL} grid at shoot chance {MAX_SHOOT_CHANCE}",
+                          setup_shielded_max_fire, None, 0),
+}
+
+def new_game(scenario, seed):
+    _, setup, _, _ = SCENARIOS[scenario]
+    game = Game(seed=seed)
+    game.player.lives = 10 ** 6  # Hits are part of the load; never run out
+    if setup is not None:
+        setup(game)
+    return game
+
+def run(scenario, ticks, seed, screen=None, quality=QUALITY_TIERS[0], render_scale=1.0, texture_display=None):
+    # Play the scenario for a number of ticks with the sweeping scripted
+    # player, drawing a frame after every tick (at a quality tier and
+    # playfield resolution scale) when a screen is given, or through the
+    # texture backend when a TextureDisplay is. Returns the seconds taken.
+    # A game that ends is set up again.
+    _, _, frame_hook, fire_every = SCENARIOS[scenario]
+    game = new_game(scenario, seed)
+    renderer = None
+    if texture_display is not None:
+        starfield = render.Starfield(rng=random.Random(seed))
+        presenter = TexturePresenter(texture_display, starfield)
+        renderer = TextureRenderer(texture_display, random.Random(seed))
+    elif screen is not None:
+        starfield = render.Starfield(rng=random.Random(seed))
+        if render_scale < 1:
+            presenter = render.ScaledPresenter(screen, starfield, render_scale)
+        else:
+            presenter = render.FlipPresenter(screen, starfield)
+        renderer = render.Renderer(presenter.playfield, random.Random(seed))
+    if renderer is not None:
+        renderer.set_quality(quality)
+        starfield.visible_layers = quality["star_layers"]
+
+    direction = 1
+    start = time.perf_counter()
+    for tick in range(ticks):
+        if game.game_over:
+            game = new_game(scenario, seed + tick)
+        player = game.player
+        if player.x <= 0 or player.x >= SCREEN_WIDTH - player.width:
+            direction = -direction
+        game.step(direction < 0, direction > 0, fire_every > 0 and tick % fire_every == 0)
+        events = game.drain_events()
+
+        if renderer is not None:
+            renderer.handle_events(events)
+            if frame_hook is not None:
+                frame_hook(renderer)
+            presenter.begin_frame()
+            renderer.draw(game)
+            presenter.finish_playfield()
+            presenter.present([])
+    return time.perf_counter() - start
+
+def main_benchmark():
+    parser = argparse.ArgumentParser(description="Benchmark whole-game throughput in worst-case scenes")
+    parser.add_argument("--ticks", type=int, default=2000, help="ticks (and frames) per scenario")
+    parser.add_argument("--seed", type=int, default=0, help="random seed shared by every scenario")
+    parser.add_argument("--only", nargs="+", choices=sorted(SCENARIOS), metavar="NAME",
+                        help=f"scenarios to run (default all: {', '.join(SCENARIOS)})")
+    parser.add_argument("--quality", choices=QUALITY_NAMES, default=QUALITY_NAMES[0],
+                        help="effects quality tier to render at")
+    parser.add_argument("--render-scale", type=float, default=1.0, metavar="SCALE",
+                        help="playfield resolution as a fraction of the screen's")
+    parser.add_argument("--renderer", choices=["surface", "texture"], default="surface",
+                        help="draw with pygame surfaces or with SDL2 textures (software rendered "
+                             "under the dummy video driver)")
+    parser.add_argument("--output", metavar="FILE", help="write the results to a JSON file")
+    args = parser.parse_args()
+    quality = QUALITY_TIERS[QUALITY_NAMES.index(args.quality)]
+
+    if args.renderer == "texture" and args.render_scale < 1:
+        parser.error("--render-scale only applies to the surface renderer")
+    if args.renderer == "texture" and not texture_backend_available():
+        parser.error("this pygame has no SDL2 render API (pygame._sdl2.video)")
+
+    pygame.init()
+    texture_display = None
+    if args.renderer == "texture":
+        texture_display = TextureDisplay("benchmark", (SCREEN_WIDTH, SCREEN_HEIGHT))
+        screen = texture_display.screen
+    else:
+        screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+
+    results = {
+        "python": platform.python_version(),
+        "pygame": pygame.version.ver,
+        "numpy": simulation.np is not None,
+        "platform": platform.platform(),
+        "ticks": args.ticks,
+        "seed": args.seed,
+        "quality": args.quality,
+        "render_scale": args.render_scale,
+        "renderer": args.renderer,
+        "scenarios": {},
+    }
+    print(f"{'scenario':<18} {'sim ticks/s':>12} {'sim+render fps':>15}  description")
+    for name in args.only or SCENARIOS:
+        description = SCENARIOS[name][0]
+        sim_seconds = run(name, args.ticks, args.seed)
+        render_seconds = run(name, args.ticks, args.seed, screen, quality, args.render_scale, texture_display)
+        result = {
+            "description": description,
+            "sim_ticks_per_sec": args.ticks / sim_seconds,
+            "render_frames_per_sec": args.ticks / render_seconds,
+        }
+        results["scenarios"][name] = result
+        print(f"{name:<18} {result['sim_ticks_per_sec']:>12.0f} "
+              f"{result['render_frames_per_sec']:>15.1f}  {description}")
+
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(results, output, indent=2)
+
+if __name__ == "__main__":
+    main_benchmark()
@@ -1,760 +1,243 @@
+import time
+
+# Startup time is measured from here (before pygame is even imported)
+START_TIME = time.perf_counter()
+
 import pygame
+import argparse
+import atexit
 import random
 import sys
 import math
 
-# Initialize Pygame
-pygame.init()
-pygame.mixer.init()  # Initialize the sound mixer
-
-# Constants
-SCREEN_WIDTH = 1280
-SCREEN_HEIGHT = 720
-PLAYER_SPEED = 8
-ENEMY_SPEED = 3
-BULLET_SPEED = 10
-ENEMY_BULLET_SPEED = 5
-ENEMY_SHOOT_CHANCE = 0.001  # 0.1% chance per frame
-ENEMY_ROWS = 5
-ENEMY_COLS = 10
-ENEMY_SPACING = 80
-ENEMY_DROP = 40
-ENEMY_MOVE_TIME = 1000  # milliseconds between enemy movements
-
-# Colors
-WHITE = (255, 255, 255)
-BLACK = (0, 0, 0)
-RED = (255, 0, 0)
-GREEN = (0, 255, 0)
-BLUE = (0, 0, 255)
-YELLOW = (255, 255, 0)
-PURPLE = (128, 0, 128)
-CYAN = (0, 255, 255)
-ORANGE = (255, 165, 0)
-DARK_BLUE = (0, 0, 128)
-LIGHT_BLUE = (173, 216, 230)
-
-# Create the screen
-screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-pygame.display.set_caption("Space Invaders")
-
-# Clock for controlling frame rate
-clock = pygame.time.Clock()
-
-# Font for text
-font = pygame.font.SysFont(None, 36)
-
-# Load sounds
-try:
-    shoot_sound = pygame.mixer.Sound("shoot.wav")
-    explosion_sound = pygame.mixer.Sound("explosion.wav")
-    powerup_sound = pygame.mixer.Sound("powerup.wav")
-    shield_sound = pygame.mixer.Sound("shield.wav")
-    speed_sound = pygame.mixer.Sound("speed.wav")
-    weapon_sound = pygame.mixer.Sound("weapon.wav")
-    life_sound = pygame.mixer.Sound("life.wav")
-    levelup_sound = pygame.mixer.Sound("levelup.wav")
-except:
-    # If sound files are missing, create dummy sound objects
-    class DummySound:
-        def play(self): pass
-    shoot_sound = explosion_sound = powerup_sound = DummySound()
-    shield_sound = speed_sound = weapon_sound = life_sound = DummySound()
-    levelup_sound = DummySound()
-
-# Star class for background
-class Star:
-    def __init__(self):
-        self.x = random.randint(0, SCREEN_WIDTH)
-        self.y = random.randint(0, SCREEN_HEIGHT)
-        self.size = random.randint(1, 3)
-        self.color = random.choice([WHITE, LIGHT_BLUE, CYAN])
-        self.speed = random.uniform(0.1, 0.5)
-
-    def update(self):
-        self.y += self.speed
-        if self.y > SCREEN_HEIGHT:
-            self.y = 0
-            self.x = random.randint(0, SCREEN_WIDTH)
-
-    def draw(self):
-        pygame.draw.circle(screen, self.color, (int(self.x), int(self.y)), self.size)
-
-class Player:
-    def __init__(self):
-        self.width = 80
-        self.height = 50
-        self.x = SCREEN_WIDTH // 2 - self.width // 2
-        self.y = SCREEN_HEIGHT - self.height - 30
-        self.speed = PLAYER_SPEED
-        self.color = CYAN
-        self.accent_color = BLUE
-        self.engine_color = ORANGE
-        self.bullets = []
-        self.lives = 3
-        self.score = 0
-        self.engine_flicker = 0
-        # Power-up effects
-        self.has_shield = False
-        self.shield_time = 0
-        self.has_speed_boost = False
-        self.speed_boost_time = 0
-        self.has_weapon_upgrade = False
-        self.weapon_upgrade_time = 0
-        self.shield_alpha = 128  # For shield transparency
-        # Visual effects
-        self.thruster_particles = []  # For engine particle effects
-
-    def draw(self):
-        # Draw thruster particles
-        for particle in self.thruster_particles[:]:
-            # Each particle is [x, y, size, lifetime, color]
-            pygame.draw.circle(screen, particle[4], (int(particle[0]), int(particle[1])), int(particle[2]))
-            # Reduce size and lifetime
-            particle[2] -= 0.2
-            particle[3] -= 1
-            if particle[3] <= 0 or particle[2] <= 0:
-                self.thruster_particles.remove(particle)
-
-        # Draw shield effect if active
-        if self.has_shield:
-            # Create a semi-transparent shield around the player
-            shield_radius = max(self.width, self.height) + 15
-            # Create a surface for the shield with per-pixel alpha
-            shield_surface = pygame.Surface((shield_radius * 2, shield_radius * 2), pygame.SRCALPHA)
-            # Draw the shield on the surface with gradient effect
-            for r in range(shield_radius, shield_radius - 5, -1):
-                alpha = self.shield_alpha - (shield_radius - r) * 10
-                pygame.draw.circle(shield_surface, (0, 100, 255, alpha), 
-                                  (shield_radius, shield_radius), r, 2)
-            # Blit the surface onto the screen
-            screen.blit(shield_surface, 
-                       (self.x + self.width // 2 - shield_radius, 
-                        self.y + self.height // 2 - shield_radius))
-
-        # Draw player ship body with color change if speed boost is active
-        ship_color = YELLOW if self.has_speed_boost else self.color
-        highlight_color = WHITE if self.has_speed_boost else LIGHT_BLUE
-
-        # Draw main hull
-        pygame.draw.polygon(screen, ship_color, [
-            (self.x + self.width // 2, self.y - 20),  # Nose
-            (self.x, self.y + self.height - 10),      # Bottom left
-            (self.x + self.width, self.y + self.height - 10)  # Bottom right
-        ])
-
-        # Draw hull highlight
-        pygame.draw.polygon(screen, highlight_color, [
-            (self.x + self.width // 2, self.y - 20),  # Nose
-            (self.x + self.width // 2 - 10, self.y + 10),  # Left middle
-            (self.x + self.width // 2 + 10, self.y + 10)   # Right middle
-        ], 1)
-
-        # Draw cockpit (more detailed)
-        pygame.draw.ellipse(screen, self.accent_color, 
-                           (self.x + self.width // 2 - 12, self.y, 24, 30))
-        # Cockpit glass reflection
-        pygame.draw.ellipse(screen, highlight_color, 
-                           (self.x + self.width // 2 - 8, self.y + 5, 16, 10), 1)
-
-        # Draw wings (more detailed)
-        # Left wing
-        pygame.draw.polygon(screen, ship_color, [
-            (self.x, self.y + self.height - 10),       # Top left
-            (self.x - 25, self.y + self.height + 15),  # Bottom left
-            (self.x + 20, self.y + self.height - 10)   # Bottom right
-        ])
-        # Left wing detail
-        pygame.draw.line(screen, highlight_color, 
-                        (self.x, self.y + self.height - 5),
-                        (self.x - 15, self.y + self.height + 10), 2)
-
-        # Right wing
-        pygame.draw.polygon(screen, ship_color, [
-            (self.x + self.width, self.y + self.height - 10),  # Top right
-            (self.x + self.width + 25, self.y + self.height + 15), # Bottom right
-            (self.x + self.width - 20, self.y + self.height - 10)   # Bottom left
-        ])
-        # Right wing detail
-        pygame.draw.line(screen, highlight_color, 
-                        (self.x + self.width, self.y + self.height - 5),
-                        (self.x + self.width + 15, self.y + self.height + 10), 2)
-
-        # Draw engine flames (with enhanced animation)
-        self.engine_flicker = (self.engine_flicker + 1) % 8
-        flame_height = 15 + self.engine_flicker
-
-        # Bigger flames if speed boost is active
-        if self.has_speed_boost:
-            flame_height += 10
-            flame_color = WHITE  # Hotter flame color
-            inner_flame_color = LIGHT_BLUE
+from assets import AssetManager
+from audio import SoundDispatcher
+from profiler import FrameProfiler
+from quality import QUALITY_NAMES, QualityController
+from replay import MAX_SEED, MAX_TICK_RATE, InputRecorder, Replay
+from simulation import SCREEN_WIDTH, SCREEN_HEIGHT, BASE_TICK_RATE, Game, RandomStreams
+from render import (WHITE, BLACK, RED, GREEN, BLUE, YELLOW, PURPLE, CYAN, ORANGE,
+                    DARK_BLUE, Renderer, Starfield, FlipPresenter, DirtyRectPresenter,
+                    ScaledPresenter, ProfilerOverlay, format_countdown, text_cache)
+from textures import TextureDisplay, TexturePresenter, TextureRenderer, texture_backend_available
+
+# Frame pacing: the display is capped at FPS while the simulation runs at a
+# fixed tick rate; a frame never feeds more than MAX_FRAME_TIME ms to it
+FPS = 60
+MAX_FRAME_TIME = 250
+
+# While fast-forwarding a replay the simulation runs flat out and a frame is
+# only drawn this often (milliseconds)
+FAST_FORWARD_DRAW_INTERVAL = 50
+
+# Transition timings in milliseconds
+HIT_FLASH_TIME = 50
+LEVEL_UP_FADE_TIME = 320
+LEVEL_UP_MESSAGE_TIME = 1500
+WAVE_CLEARED_TIME = 1000
+
+# Font sizes only needed after the menu (preloaded in the background): the
+# game over title pulse and the profiler overlay
+GAME_OVER_FONT_SIZES = range(50, 61)
+PROFILER_FONT_SIZE = 20
+
+# Display, frame clock, font, the shared starfield and the sound effect
+# dispatcher are created by init_display(). With the texture backend, screen
+# is an off-screen surface shown through texture_display.
+screen = None
+texture_display = None
+clock = None
+font = None
+starfield = None
+sounds = None
+
+# Sounds, music and fonts; sounds stay silent until they have loaded
+assets = AssetManager()
+first_frame_time = None  # Seconds from START_TIME to the first frame shown
+report_startup = False
+
+def init_display(rngs, backend="surface"):
+    global screen, texture_display, clock, font, starfield, sounds
+
+    # Initialize Pygame
+    pygame.init()
+    pygame.mixer.init()  # Initialize the sound mixer
+    sounds = SoundDispatcher(assets)
+
+    # Create the screen
+    if backend == "texture":
+        if not texture_backend_available():
+            print("This pygame has no SDL2 render API; using the surface renderer")
         else:
-            flame_color = self.engine_color
-            inner_flame_color = YELLOW
-
-        # Left engine
-        pygame.draw.polygon(screen, flame_color, [
-            (self.x + 20, self.y + self.height - 10),
-            (self.x + 10, self.y + self.height + flame_height),
-            (self.x + 30, self.y + self.height - 10)
-        ])
-        # Inner flame
-        pygame.draw.polygon(screen, inner_flame_color, [
-            (self.x + 20, self.y + self.height - 5),
-            (self.x + 15, self.y + self.height + flame_height - 10),
-            (self.x + 25, self.y + self.height - 5)
-        ])
-
-        # Right engine
-        pygame.draw.polygon(screen, flame_color, [
-            (self.x + self.width - 20, self.y + self.height - 10),
-            (self.x + self.width - 10, self.y + self.height + flame_height),
-            (self.x + self.width - 30, self.y + self.height - 10)
-        ])
-        # Inner flame
-        pygame.draw.polygon(screen, inner_flame_color, [
-            (self.x + self.width - 20, self.y + self.height - 5),
-            (self.x + self.width - 15, self.y + self.height + flame_height - 10),
-            (self.x + self.width - 25, self.y + self.height - 5)
-        ])
-
-        # Add thruster particles
-        if random.random() < 0.3:  # 30% chance each frame
-            # Left thruster
-            particle_x = self.x + 20 + random.uniform(-5, 5)
-            particle_y = self.y + self.height + random.uniform(0, flame_height)
-            particle_size = random.uniform(1.5, 3)
-            particle_lifetime = random.randint(10, 20)
-            particle_color = random.choice([ORANGE, YELLOW, RED])
-            self.thruster_particles.append([particle_x, particle_y, particle_size, particle_lifetime, particle_color])
-
-            # Right thruster
-            particle_x = self.x + self.width - 20 + random.uniform(-5, 5)
-            particle_y = self.y + self.height + random.uniform(0, flame_height)
-            particle_size = random.uniform(1.5, 3)
-            particle_lifetime = random.randint(10, 20)
-            particle_color = random.choice([ORANGE, YELLOW, RED])
-            self.thruster_particles.append([particle_x, particle_y, particle_size, particle_lifetime, particle_color])
-
-        # Draw bullets with different color if weapon upgrade is active
-        bullet_color = RED if self.has_weapon_upgrade else YELLOW
-        inner_color = ORANGE if self.has_weapon_upgrade else WHITE
-        glow_color = (255, 100, 100, 100) if self.has_weapon_upgrade else (255, 255, 100, 100)
-
-        for bullet in self.bullets:
-            # Draw bullet glow effect
-            bullet_surface = pygame.Surface((14, 14), pygame.SRCALPHA)
-            pygame.draw.circle(bullet_surface, glow_color, (7, 7), 6)
-            screen.blit(bullet_surface, (int(bullet[0]) - 7, int(bullet[1]) - 7))
-
-            # Draw main bullet
-            pygame.draw.circle(screen, bullet_color, (int(bullet[0]), int(bullet[1])), 4)
-            pygame.draw.circle(screen, inner_color, (int(bullet[0]), int(bullet[1])), 2)
-
-    def move(self, direction):
-        if direction == "left" and self.x > 0:
-            self.x -= self.speed
-        if direction == "right" and self.x < SCREEN_WIDTH - self.width:
-            self.x += self.speed
-
-    def shoot(self):
-        # Base bullet position
-        bullet_y = self.y - 10
-
-        if self.has_weapon_upgrade:
-            # Triple shot when weapon upgrade is active
-            self.bullets.append([self.x + self.width // 2 - 1.5, bullet_y])  # Center bullet
-            self.bullets.append([self.x + 10, bullet_y])                     # Left bullet
-            self.bullets.append([self.x + self.width - 10, bullet_y])        # Right bullet
-        else:
-            # Single bullet
-            bullet_x = self.x + self.width // 2 - 1.5
-            self.bullets.append([bullet_x, bullet_y])
-
-    def update_bullets(self):
-        # Move bullets up and remove those that go off screen
-        for bullet in self.bullets[:]:
-            bullet[1] -= BULLET_SPEED
-            if bullet[1] < 0:
-                self.bullets.remove(bullet)
-
-    def update_power_ups(self, current_time):
-        # Update power-up timers and deactivate expired power-ups
-
-        # Shield power-up
-        if self.has_shield and current_time > self.shield_time:
-            self.has_shield = False
-
-        # Speed boost power-up
-        if self.has_speed_boost and current_time > self.speed_boost_time:
-            self.has_speed_boost = False
-            self.speed = PLAYER_SPEED  # Reset speed to normal
-
-        # Weapon upgrade power-up
-        if self.has_weapon_upgrade and current_time > self.weapon_upgrade_time:
-            self.has_weapon_upgrade = False
-
-        # Make shield pulse for visual effect
-        if self.has_shield:
-            self.shield_alpha = 128 + int(30 * math.sin(current_time / 200))
-
-class Enemy:
-    def __init__(self, x, y, row):
-        self.width = 60
-        self.height = 45
-        self.x = x
-        self.y = y
-        self.row = row
-        # Different colors based on row
-        if row == 0:
-            self.color = PURPLE
-            self.glow_color = (180, 100, 255)  # Light purple glow
-        elif row == 1:
-            self.color = RED
-            self.glow_color = (255, 100, 100)  # Light red glow
-        elif row == 2:
-            self.color = ORANGE
-            self.glow_color = (255, 180, 100)  # Light orange glow
-        elif row == 3:
-            self.color = YELLOW
-            self.glow_color = (255, 255, 100)  # Light yellow glow
-        else:
-            self.color = GREEN
-            self.glow_color = (100, 255, 100)  # Light green glow
+            try:
+                texture_display = TextureDisplay("Space Invaders", (SCREEN_WIDTH, SCREEN_HEIGHT))
+                screen = texture_display.screen
+            except pygame.error as error:
+                print(f"Cannot create an SDL renderer ({error}); using the surface renderer")
+    if texture_display is None:
+        screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+        pygame.display.set_caption("Space Invaders")
+
+    # Clock for controlling frame rate
+    clock = pygame.time.Clock()
+
+    # Font for text
+    font = assets.font(36)
+
+    # Background stars, shared by every screen
+    starfield = Starfield(rng=rngs.get("starfield"))
+
+def show_screen():
+    # Show the finished screen (menus and other full-screen pages)
+    if texture_display is not None:
+        texture_display.show_screen()
+    else:
+        pygame.display.flip()
 
-        self.direction = 1  # 1 for right, -1 for left
-        self.animation_state = 0
-        self.animation_speed = 0.1
-        self.pulse_size = 0
-        self.pulse_direction = 1
-        self.tentacle_particles = []  # For tentacle particle effects
+def mark_first_frame():
+    # Record (and optionally report) the time to the first frame on screen
+    global first_frame_time
+    if first_frame_time is None:
+        first_frame_time = time.perf_counter() - START_TIME
+        if report_startup:
+            print(f"First frame after {first_frame_time * 1000:.1f} ms")
+
+def print_asset_report():
+    print(assets.report())
+
+def apply_quality(tier, renderer):
+    # Switch the game's effects to a quality tier
+    renderer.set_quality(tier)
+    starfield.visible_layers = tier["star_layers"]
+
+def print_sound_report():
+    print(sounds.report())
+
+def play_event_sounds(events):
+    # Play the sound effects for the events of a frame's simulation steps;
+    # the same sound asked for more than once among them plays once
+    for kind, x, y, detail in events:
+        if kind == "shot":
+            sounds.play("shoot")
+        elif kind == "enemy_destroyed" or kind == "player_hit":
+            sounds.play("explosion")
+        elif kind == "shield_hit":
+            # Play shield impact sound
+            sounds.play("shield")
+        elif kind == "power_up":
+            sounds.play(detail)
+            # Play general power-up collection sound
+            sounds.play("powerup")
+        elif kind == "level_up":
+            sounds.play("levelup")
+    sounds.flush()
+
+class Transition:
+    # A timed screen effect driven by the main loop instead of blocking it.
+    # While a transition that holds the game is running the simulation is
+    # not stepped, but events, audio and frame pacing carry on as usual.
+    def __init__(self, duration, holds_game):
+        self.start_time = pygame.time.get_ticks()
+        self.duration = duration
+        self.holds_game = holds_game
+
+    def elapsed(self):
+        return pygame.time.get_ticks() - self.start_time
+
+    def finished(self):
+        return self.elapsed() >= self.duration
+
+    def covers_playfield(self):
+        # True while the transition replaces the playfield entirely
+        return False
 
     def draw(self):
-        # Animate the enemy by oscillating between states
-        self.animation_state = (self.animation_state + self.animation_speed) % 2
-
-        # Pulse animation for body size
-        if self.pulse_direction == 1:
-            self.pulse_size += 0.05
-            if self.pulse_size >= 1:
-                self.pulse_direction = -1
-        else:
-            self.pulse_size -= 0.05
-            if self.pulse_size <= -1:
-                self.pulse_direction = 1
-
-        pulse_width = self.width + self.pulse_size * 2
-        pulse_height = self.height + self.pulse_size * 2
-
-        # Draw glow effect
-        glow_surface = pygame.Surface((int(pulse_width + 20), int(pulse_height + 20)), pygame.SRCALPHA)
-        pygame.draw.ellipse(glow_surface, (*self.glow_color, 100), 
-                           (10, 10, int(pulse_width), int(pulse_height)))
-        screen.blit(glow_surface, (int(self.x - 10), int(self.y - 10)))
+        # Draw the current state; returns the rect drawn on
+        return None
 
-        # Draw the main body
-        pygame.draw.ellipse(screen, self.color, 
-                           (int(self.x), int(self.y), int(pulse_width), int(pulse_height)))
-
-        # Draw body pattern/texture
-        pattern_color = tuple(min(255, c + 50) for c in self.color)
-        for i in range(3):
-            pygame.draw.ellipse(screen, pattern_color, 
-                               (int(self.x + pulse_width/4 + i*10), 
-                                int(self.y + pulse_height/3), 
-                                int(pulse_width/6), int(pulse_height/4)), 
-                               1)
-
-        # Draw the eyes (larger and more detailed)
-        eye_color = WHITE
-        eye_size = 8
-        left_eye_x = int(self.x + pulse_width/4)
-        right_eye_x = int(self.x + 3*pulse_width/4)
-        eye_y = int(self.y + pulse_height/3)
-
-        # Eye whites
-        pygame.draw.circle(screen, eye_color, (left_eye_x, eye_y), eye_size)
-        pygame.draw.circle(screen, eye_color, (right_eye_x, eye_y), eye_size)
-
-        # Eye highlights
-        pygame.draw.circle(screen, (200, 200, 255), 
-                          (left_eye_x - 2, eye_y - 2), 2)
-        pygame.draw.circle(screen, (200, 200, 255), 
-                          (right_eye_x - 2, eye_y - 2), 2)
-
-        # Draw pupils (they move for animation)
-        pupil_offset = 3 * math.sin(self.animation_state * math.pi)
-        pupil_size = 3
-        pygame.draw.circle(screen, BLACK, 
-                          (int(left_eye_x + pupil_offset), eye_y), pupil_size)
-        pygame.draw.circle(screen, BLACK, 
-                          (int(right_eye_x + pupil_offset), eye_y), pupil_size)
-
-        # Draw tentacles with improved animation
-        tentacle_count = 5
-        tentacle_spacing = pulse_width / (tentacle_count + 1)
-        tentacle_base_height = 8 + 4 * math.sin(self.animation_state * math.pi * 2)
-
-        for i in range(tentacle_count):
-            # Calculate tentacle position with wave effect
-            x_pos = self.x + (i + 1) * tentacle_spacing
-            wave_offset = 3 * math.sin(self.animation_state * math.pi * 2 + i)
-
-            # Draw main tentacle
-            tentacle_height = tentacle_base_height + i % 3 * 2
-            pygame.draw.line(screen, self.color, 
-                            (x_pos, self.y + pulse_height),
-                            (x_pos + wave_offset, self.y + pulse_height + tentacle_height), 
-                            4)
-
-            # Draw tentacle suction cup
-            pygame.draw.circle(screen, pattern_color, 
-                              (int(x_pos + wave_offset), 
-                               int(self.y + pulse_height + tentacle_height)), 
-                              3)
-
-            # Add tentacle particles occasionally
-            if random.random() < 0.02:  # 2% chance per tentacle per frame
-                particle_x = x_pos + wave_offset
-                particle_y = self.y + pulse_height + tentacle_height
-                particle_size = random.uniform(1, 2)
-                particle_lifetime = random.randint(5, 15)
-                particle_color = self.glow_color
-                self.tentacle_particles.append([particle_x, particle_y, particle_size, particle_lifetime, particle_color])
-
-        # Draw tentacle particles
-        for particle in self.tentacle_particles[:]:
-            # Each particle is [x, y, size, lifetime, color]
-            pygame.draw.circle(screen, particle[4], (int(particle[0]), int(particle[1])), int(particle[2]))
-            # Move particle down slightly
-            particle[1] += 0.5
-            # Reduce size and lifetime
-            particle[2] -= 0.1
-            particle[3] -= 1
-            if particle[3] <= 0 or particle[2] <= 0:
-                self.tentacle_particles.remove(particle)
-
-class PowerUp:
-    def __init__(self, x, y):
-        self.x = x
-        self.y = y
-        self.width = 20
-        self.height = 20
-        self.speed = 2
-        # Randomly choose a power-up type
-        self.type = random.choice(["speed", "weapon", "shield", "life"])
-        # Set color based on type
-        if self.type == "speed":
-            self.color = CYAN  # Speed boost - cyan
-        elif self.type == "weapon":
-            self.color = RED   # Weapon upgrade - red
-        elif self.type == "shield":
-            self.color = BLUE  # Shield - blue
-        elif self.type == "life":
-            self.color = GREEN # Extra life - green
-        self.pulse_size = 0
-        self.pulse_direction = 1
-
-    def update(self):
-        # Move down
-        self.y += self.speed
-
-        # Pulse animation
-        if self.pulse_direction == 1:
-            self.pulse_size += 0.2
-            if self.pulse_size >= 5:
-                self.pulse_direction = -1
-        else:
-            self.pulse_size -= 0.2
-            if self.pulse_size <= 0:
-                self.pulse_direction = 1
-
-    def draw(self):
-        # Draw the power-up with a pulsing effect
-        pygame.draw.circle(screen, self.color, (int(self.x), int(self.y)), int(10 + self.pulse_size))
-
-        # Draw an icon inside based on the power-up type
-        if self.type == "speed":
-            # Draw lightning bolt
-            pygame.draw.line(screen, WHITE, (self.x - 5, self.y - 3), (self.x + 3, self.y + 3), 2)
-            pygame.draw.line(screen, WHITE, (self.x + 3, self.y + 3), (self.x - 3, self.y + 8), 2)
-        elif self.type == "weapon":
-            # Draw crosshair
-            pygame.draw.circle(screen, WHITE, (int(self.x), int(self.y)), 5, 1)
-            pygame.draw.line(screen, WHITE, (self.x - 8, self.y), (self.x + 8, self.y), 1)
-            pygame.draw.line(screen, WHITE, (self.x, self.y - 8), (self.x, self.y + 8), 1)
-        elif self.type == "shield":
-            # Draw shield icon
-            pygame.draw.arc(screen, WHITE, (self.x - 5, self.y - 5, 10, 10), 0.5, 2.5, 2)
-        elif self.type == "life":
-            # Draw heart
-            pygame.draw.circle(screen, WHITE, (int(self.x - 3), int(self.y - 2)), 3)
-            pygame.draw.circle(screen, WHITE, (int(self.x + 3), int(self.y - 2)), 3)
-            pygame.draw.polygon(screen, WHITE, [
-                (self.x - 6, self.y - 1),
-                (self.x, self.y + 5),
-                (self.x + 6, self.y - 1)
-            ])
-
-class EnemyGroup:
+class HitFlash(Transition):
+    # Brief semi-transparent red flash when the player is hit
     def __init__(self):
-        self.enemies = []
-        self.bullets = []
-        self.explosions = []  # List to store explosion effects
-        self.power_ups = []   # List to store power-ups
-        self.direction = 1  # 1 for right, -1 for left
-        self.drop_flag = False
-        self.last_move_time = pygame.time.get_ticks()
-        self.speed = ENEMY_SPEED
-
-        # Calculate total width and height of enemy grid
-        total_width = ENEMY_COLS * ENEMY_SPACING
-        total_height = ENEMY_ROWS * ENEMY_SPACING
-
-        # Calculate starting positions to center the grid both horizontally and vertically
-        start_x = (SCREEN_WIDTH - total_width) // 2
-        start_y = (SCREEN_HEIGHT - total_height) // 3  # Position in the top third of the screen
-
-        # Create grid of enemies
-        for row in range(ENEMY_ROWS):
-            for col in range(ENEMY_COLS):
-                x = start_x + col * ENEMY_SPACING
-                y = start_y + row * ENEMY_SPACING
-                self.enemies.append(Enemy(x, y, row))
+        super().__init__(HIT_FLASH_TIME, False)
+        # Per-pixel alpha (here and in the level up flash) also blends
+        # correctly onto the texture backend's transparent HUD layer
+        self.flash_surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
+        self.flash_surface.fill((*RED, 100))  # Semi-transparent
 
     def draw(self):
-        for enemy in self.enemies:
-            enemy.draw()
-
-        # Draw enemy bullets
-        for bullet in self.bullets:
-            # Draw a more interesting bullet (small red circle with a tail)
-            pygame.draw.circle(screen, RED, (int(bullet[0]), int(bullet[1])), 3)
-            pygame.draw.circle(screen, YELLOW, (int(bullet[0]), int(bullet[1] - 5)), 1)
-
-        # Draw explosions
-        for explosion in self.explosions[:]:
-            # Each explosion is [x, y, size, lifetime]
-            pygame.draw.circle(screen, ORANGE, (explosion[0], explosion[1]), explosion[2])
-            pygame.draw.circle(screen, YELLOW, (explosion[0], explosion[1]), explosion[2] - 3)
-
-            # Reduce lifetime and remove if expired
-            explosion[3] -= 1
-            if explosion[3] <= 0:
-                self.explosions.remove(explosion)
-
-        # Draw power-ups
-        for power_up in self.power_ups:
-            power_up.draw()
-
-    def move(self):
-        current_time = pygame.time.get_ticks()
-
-        # Move enemies at regular intervals
-        if current_time - self.last_move_time > ENEMY_MOVE_TIME:
-            self.last_move_time = current_time
-
-            # Check if any enemy would hit the edge
-            move_down = False
-            for enemy in self.enemies:
-                if (enemy.x + enemy.width + self.speed > SCREEN_WIDTH and self.direction > 0) or \
-                   (enemy.x - self.speed < 0 and self.direction < 0):
-                    move_down = True
-                    break
+        return screen.blit(self.flash_surface, (0, 0))
 
-            # Move enemies
-            for enemy in self.enemies:
-                if move_down:
-                    enemy.y += ENEMY_DROP
-                else:
-                    enemy.x += self.speed * self.direction
-
-            # Change direction if needed
-            if move_down:
-                self.direction *= -1
-
-    def shoot(self):
-        # Randomly select enemies to shoot
-        for enemy in self.enemies:
-            if random.random() < ENEMY_SHOOT_CHANCE:
-                bullet_x = enemy.x + enemy.width // 2 - 1.5
-                bullet_y = enemy.y + enemy.height
-                self.bullets.append([bullet_x, bullet_y])
-
-    def update_bullets(self):
-        # Move bullets down and remove those that go off screen
-        for bullet in self.bullets[:]:
-            bullet[1] += ENEMY_BULLET_SPEED
-            if bullet[1] > SCREEN_HEIGHT:
-                self.bullets.remove(bullet)
-
-    def update_power_ups(self):
-        # Update power-ups and remove those that go off screen
-        for power_up in self.power_ups[:]:
-            power_up.update()
-            if power_up.y > SCREEN_HEIGHT:
-                self.power_ups.remove(power_up)
-
-def check_collisions(player, enemy_group, enemies_killed=None):
-    # Check player bullets hitting enemies
-    for bullet in player.bullets[:]:
-        bullet_hit = False
-        for enemy in enemy_group.enemies[:]:
-            if (bullet[0] >= enemy.x and bullet[0] <= enemy.x + enemy.width and
-                bullet[1] >= enemy.y and bullet[1] <= enemy.y + enemy.height):
-                # Create explosion effect
-                explosion_x = enemy.x + enemy.width // 2
-                explosion_y = enemy.y + enemy.height // 2
-                explosion_size = 15
-                explosion_lifetime = 15
-                enemy_group.explosions.append([explosion_x, explosion_y, explosion_size, explosion_lifetime])
-
-                # Play explosion sound
-                explosion_sound.play()
-
-                # Chance to spawn a power-up (20% probability)
-                if random.random() < 0.2:
-                    power_up = PowerUp(explosion_x, explosion_y)
-                    enemy_group.power_ups.append(power_up)
-
-                # Remove enemy and update score
-                enemy_group.enemies.remove(enemy)
-                player.score += 10
-
-                # Increment enemies killed counter if provided
-                if enemies_killed is not None:
-                    enemies_killed[0] += 1
-
-                bullet_hit = True
-                break
-
-        # Remove bullet if it hit an enemy
-        if bullet_hit and bullet in player.bullets:
-            player.bullets.remove(bullet)
-
-    # Check enemy bullets hitting player
-    for bullet in enemy_group.bullets[:]:
-        if (bullet[0] >= player.x and bullet[0] <= player.x + player.width and
-            bullet[1] >= player.y and bullet[1] <= player.y + player.height):
-            # Remove the bullet
-            if bullet in enemy_group.bullets:
-                enemy_group.bullets.remove(bullet)
-
-            # Create impact effect at bullet position
-            explosion_x = bullet[0]
-            explosion_y = bullet[1]
-
-            # If player has shield, don't lose a life
-            if player.has_shield:
-                # Create a shield impact effect (blue)
-                explosion_size = 10
-                explosion_lifetime = 10
-                enemy_group.explosions.append([explosion_x, explosion_y, explosion_size, explosion_lifetime])
-                # Play shield impact sound
-                shield_sound.play()
-            else:
-                # Create a hit effect (red)
-                explosion_size = 15
-                explosion_lifetime = 15
-                enemy_group.explosions.append([explosion_x, explosion_y, explosion_size, explosion_lifetime])
-                # Reduce player lives
-                player.lives -= 1
-                # Play explosion sound
-                explosion_sound.play()
-
-                # Create a screen flash effect when player is hit
-                flash_surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
-                flash_surface.fill(RED)
-                flash_surface.set_alpha(100)  # Semi-transparent
-                screen.blit(flash_surface, (0, 0))
-                pygame.display.flip()
-                pygame.time.delay(30)  # Brief flash
-            break
-
-    # Check player collecting power-ups
-    current_time = pygame.time.get_ticks()
-    power_up_duration = 10000  # 10 seconds
-
-    for power_up in enemy_group.power_ups[:]:
-        # Check if player collides with power-up
-        if (power_up.x >= player.x and power_up.x <= player.x + player.width and
-            power_up.y >= player.y and power_up.y <= player.y + player.height):
-
-            # Apply power-up effect based on type
-            if power_up.type == "speed":
-                player.has_speed_boost = True
-                player.speed_boost_time = current_time + power_up_duration
-                player.speed = PLAYER_SPEED * 1.5  # 50% speed boost
-                speed_sound.play()
-
-            elif power_up.type == "weapon":
-                player.has_weapon_upgrade = True
-                player.weapon_upgrade_time = current_time + power_up_duration
-                weapon_sound.play()
-
-            elif power_up.type == "shield":
-                player.has_shield = True
-                player.shield_time = current_time + power_up_duration
-                shield_sound.play()
-
-            elif power_up.type == "life":
-                player.lives += 1  # Extra life
-                life_sound.play()
+class LevelUpTransition(Transition):
+    # Fade to yellow, show the level up message, then fade the flash back out
+    def __init__(self, current_level):
+        super().__init__(LEVEL_UP_FADE_TIME * 2 + LEVEL_UP_MESSAGE_TIME, True)
+        self.current_level = current_level
+        self.flash_surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
+        self.flash_surface.fill(YELLOW)
 
-            # Play general power-up collection sound
-            powerup_sound.play()
+    def covers_playfield(self):
+        return self.elapsed() >= LEVEL_UP_FADE_TIME
 
-            # Create a collection effect
-            explosion_x = power_up.x
-            explosion_y = power_up.y
-            explosion_size = 15
-            explosion_lifetime = 10
-            enemy_group.explosions.append([explosion_x, explosion_y, explosion_size, explosion_lifetime])
+    def draw(self):
+        elapsed = self.elapsed()
+        if elapsed < LEVEL_UP_FADE_TIME:
+            # Fade in over the playfield
+            self.flash_surface.set_alpha(int(255 * elapsed / LEVEL_UP_FADE_TIME))
+            return screen.blit(self.flash_surface, (0, 0))
 
-            # Remove the collected power-up
-            enemy_group.power_ups.remove(power_up)
-            break
+        # Display level up message
+        screen.fill(BLACK)
+        draw_text(f"LEVEL {self.current_level}!", YELLOW, SCREEN_WIDTH // 2 - 70, SCREEN_HEIGHT // 2)
+        draw_text("Get ready for more enemies!", WHITE, SCREEN_WIDTH // 2 - 150, SCREEN_HEIGHT // 2 + 50)
+
+        fade_out = elapsed - LEVEL_UP_FADE_TIME - LEVEL_UP_MESSAGE_TIME
+        if fade_out >= 0:
+            # Fade out
+            self.flash_surface.set_alpha(max(0, int(128 * (1 - fade_out / LEVEL_UP_FADE_TIME))))
+            screen.blit(self.flash_surface, (0, 0))
+        return screen.get_rect()
+
+class WaveClearedTransition(Transition):
+    # Show the wave cleared message for a moment
+    def __init__(self):
+        super().__init__(WAVE_CLEARED_TIME, True)
 
-    # Check if enemies reached the player's level
-    for enemy in enemy_group.enemies:
-        if enemy.y + enemy.height >= player.y:
-            return True  # Game over
+    def covers_playfield(self):
+        return True
 
-    return False  # Game continues
+    def draw(self):
+        # Display wave cleared message
+        screen.fill(BLACK)
+        draw_text("Wave Cleared!", YELLOW, SCREEN_WIDTH // 2 - 80, SCREEN_HEIGHT // 2)
+        draw_text("Get ready for the next wave!", WHITE, SCREEN_WIDTH // 2 - 150, SCREEN_HEIGHT // 2 + 50)
+        return screen.get_rect()
 
 def draw_text(text, color, x, y):
-    text_surface = font.render(text, True, color)
-    screen.blit(text_surface, (x, y))
-
-def game_over_screen(player):
-    # Create starfield background for game over screen
-    stars = [Star() for _ in range(150)]  # More stars for dramatic effect
-
-    # Create explosion particles at player position
-    explosion_particles = []
+    text_surface = text_cache.render(font, text, color)
+    return screen.blit(text_surface, (x, y))
+
+def game_over_screen(player, rng, explosion_particles):
+    # Burst explosion particles at the player's position. The game's particle
+    # system (the renderer's) is reused: what was left of the last frame's
+    # thrusters and explosions is cleared first, and the burst is cleared on
+    # the way out so it does not carry into the next game.
+    explosion_particles.clear()
+    explosion_styles = [explosion_particles.style(color) for color in (RED, ORANGE, YELLOW, WHITE)]
     for _ in range(100):
-        angle = random.uniform(0, math.pi * 2)
-        speed = random.uniform(1, 5)
-        size = random.uniform(1, 4)
-        lifetime = random.randint(30, 90)
-        color = random.choice([RED, ORANGE, YELLOW, WHITE])
-        particle = {
-            'x': SCREEN_WIDTH // 2,
-            'y': SCREEN_HEIGHT - 100,
-            'dx': math.cos(angle) * speed,
-            'dy': math.sin(angle) * speed,
-            'size': size,
-            'lifetime': lifetime,
-            'color': color
-        }
-        explosion_particles.append(particle)
+        angle = rng.uniform(0, math.pi * 2)
+        speed = rng.uniform(1, 5)
+        size = rng.uniform(1, 4)
+        lifetime = rng.randint(30, 90)
+        style = rng.choice(explosion_styles)
+        explosion_particles.emit(SCREEN_WIDTH // 2, SCREEN_HEIGHT - 100, size, lifetime, style,
+                                 dx=math.cos(angle) * speed, dy=math.sin(angle) * speed,
+                                 shrink=0.03)
 
     waiting = True
     return_to_menu = False
     start_time = pygame.time.get_ticks()
 
-    # For pulsating text effect
+    # For pulsating text effect (one font per pulse size, so the title text caches)
     pulse_value = 0
     pulse_direction = 1
 
@@ -792,27 +275,16 @@ def game_over_screen(player):
         screen.fill(BLACK)
 
         # Update and draw stars with parallax effect
-        for star in stars:
-            star.update()
-            star.draw()
+        starfield.update()
+        starfield.draw(screen)
 
         # Update and draw explosion particles
-        for particle in explosion_particles[:]:
-            particle['x'] += particle['dx']
-            particle['y'] += particle['dy']
-            particle['lifetime'] -= 1
-            particle['size'] -= 0.03
-
-            if particle['lifetime'] <= 0 or particle['size'] <= 0:
-                explosion_particles.remove(particle)
-            else:
-                pygame.draw.circle(screen, particle['color'], 
-                                  (int(particle['x']), int(particle['y'])), 
-                                  int(particle['size']))
+        explosion_particles.update()
+        explosion_particles.draw(screen)
 
         # Draw game over text with pulsating effect
-        title_font = pygame.font.SysFont(None, pulse_size)
-        title_text = title_font.render("GAME OVER", True, pulse_color)
+        title_font = assets.font(pulse_size)
+        title_text = text_cache.render(title_font, "GAME OVER", pulse_color)
         title_rect = title_text.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2 - 70))
         screen.blit(title_text, title_rect)
 
@@ -828,21 +300,19 @@ def game_over_screen(player):
         draw_text("Press M to return to main menu", WHITE, SCREEN_WIDTH // 2 - 150, SCREEN_HEIGHT // 2 + 100)
         draw_text("Press ESC to quit", WHITE, SCREEN_WIDTH // 2 - 100, SCREEN_HEIGHT // 2 + 150)
 
-        pygame.display.flip()
+        show_screen()
         clock.tick(60)  # Higher framerate for smoother animations
 
+    explosion_particles.clear()
     return return_to_menu
 
 def main_menu():
-    # Create starfield background for menu
-    stars = [Star() for _ in range(100)]
-
     # Menu options
     menu_options = ["Start Game", "Instructions", "Quit"]
     selected_option = 0
 
     # Title font (larger than regular font)
-    title_font = pygame.font.SysFont(None, 72)
+    title_font = assets.font(72)
 
     # Animation variables for decorative spaceship
     ship_x = SCREEN_WIDTH // 4
@@ -879,9 +349,8 @@ def main_menu():
         screen.fill(BLACK)
 
         # Update and draw stars
-        for star in stars:
-            star.update()
-            star.draw()
+        starfield.update()
+        starfield.draw(screen)
 
         # Update decorative spaceship position
         ship_x += ship_speed * ship_direction
@@ -941,7 +410,7 @@ def main_menu():
         # Draw title with pulsing effect
         pulse = math.sin(pygame.time.get_ticks() / 300) * 10
         title_color = (255, 255, max(0, int(pulse)))  # Slightly pulsing yellow
-        title_surface = title_font.render("SPACE INVADERS", True, title_color)
+        title_surface = text_cache.render(title_font, "SPACE INVADERS", title_color)
         screen.blit(title_surface, (SCREEN_WIDTH // 2 - title_surface.get_width() // 2, 100))
 
         # Draw menu options
@@ -990,13 +459,11 @@ def main_menu():
                             (enemy_x + 10 + i*10, enemy_y + 30 + tentacle_height), 
                             3)
 
-        pygame.display.flip()
+        show_screen()
+        mark_first_frame()
         clock.tick(30)
 
 def show_instructions():
-    # Create starfield background for instructions screen
-    stars = [Star() for _ in range(100)]
-
     # Instructions loop
     instructions_active = True
     while instructions_active:
@@ -1014,9 +481,8 @@ def show_instructions():
         screen.fill(BLACK)
 
         # Update and draw stars
-        for star in stars:
-            star.update()
-            star.draw()
+        starfield.update()
+        starfield.draw(screen)
 
         # Draw title
         draw_text("INSTRUCTIONS", YELLOW, SCREEN_WIDTH // 2 - 100, 80)
@@ -1045,16 +511,13 @@ def show_instructions():
         # Draw footer
         draw_text("Press ESC or ENTER to return to menu", WHITE, SCREEN_WIDTH // 2 - 200, SCREEN_HEIGHT - 50)
 
-        pygame.display.flip()
+        show_screen()
         clock.tick(30)
 
-def pause_game():
+def pause_game(presenter):
     paused = True
     return_to_menu = False
 
-    # Create starfield background for pause screen
-    stars = [Star() for _ in range(100)]
-
     while paused:
         # Handle events
         for event in pygame.event.get():
@@ -1072,245 +535,301 @@ def pause_game():
                     sys.exit()
 
         # Draw background
-        screen.fill(BLACK)
-
-        # Update and draw stars
-        for star in stars:
-            star.update()
-            star.draw()
+        presenter.begin_frame()
+        presenter.finish_playfield()
 
         # Display pause message
-        draw_text("PAUSED", YELLOW, SCREEN_WIDTH // 2 - 70, SCREEN_HEIGHT // 2 - 50)
-        draw_text("Press P to continue", WHITE, SCREEN_WIDTH // 2 - 120, SCREEN_HEIGHT // 2 + 20)
-        draw_text("Press M to return to main menu", WHITE, SCREEN_WIDTH // 2 - 180, SCREEN_HEIGHT // 2 + 60)
-        draw_text("Press ESC to quit", WHITE, SCREEN_WIDTH // 2 - 100, SCREEN_HEIGHT // 2 + 100)
-
-        pygame.display.flip()
+        presenter.present([
+            draw_text("PAUSED", YELLOW, SCREEN_WIDTH // 2 - 70, SCREEN_HEIGHT // 2 - 50),
+            draw_text("Press P to continue", WHITE, SCREEN_WIDTH // 2 - 120, SCREEN_HEIGHT // 2 + 20),
+            draw_text("Press M to return to main menu", WHITE, SCREEN_WIDTH // 2 - 180, SCREEN_HEIGHT // 2 + 60),
+            draw_text("Press ESC to quit", WHITE, SCREEN_WIDTH // 2 - 100, SCREEN_HEIGHT // 2 + 100),
+        ])
         clock.tick(30)
 
     return return_to_menu
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="Space Invaders")
+    parser.add_argument("--tick-rate", type=int, default=BASE_TICK_RATE,
+                        help=f"simulation steps per second (default {BASE_TICK_RATE})")
+    parser.add_argument("--seed", type=int,
+                        help="random seed (default: a new one every run)")
+    replay_options = parser.add_mutually_exclusive_group()
+    replay_options.add_argument("--record", metavar="PATH",
+                                help="record the session's input to a replay file")
+    replay_options.add_argument("--replay", metavar="PATH",
+                                help="play back a recorded session, then hand over control")
+    parser.add_argument("--fast-forward", action="store_true",
+                        help="run a replay as fast as possible instead of in real time")
+    parser.add_argument("--dirty-rects", action="store_true",
+                        help="only redraw and update the parts of the screen that change "
+                             "(static background; for software-rendered displays)")
+    parser.add_argument("--profile", action="store_true",
+                        help="start with the frame-time profiler overlay shown (toggle with F3)")
+    parser.add_argument("--asset-report", action="store_true",
+                        help="print the time to the first frame and, on exit, how long each asset took to load")
+    parser.add_argument("--profile-csv", metavar="PATH",
+                        help="profile from the start and write every frame's stage timings to a CSV file")
+    parser.add_argument("--sound-report", action="store_true",
+                        help="on exit, print how many sound effects were played, coalesced, cut short or dropped")
+    parser.add_argument("--quality", choices=["auto"] + QUALITY_NAMES, default="auto",
+                        help="effects quality tier (default auto: shed effects while frames run over budget)")
+    parser.add_argument("--render-scale", type=float, default=1.0, metavar="SCALE",
+                        help="draw the playfield at this fraction of the screen resolution and scale it up "
+                             "(e.g. 0.5 for 640x360, 0.75 for 960x540); the HUD stays sharp")
+    parser.add_argument("--smooth-scale", action="store_true",
+                        help="smooth the scaled-up playfield instead of enlarging its pixels")
+    parser.add_argument("--renderer", choices=["surface", "texture"], default="surface",
+                        help="draw with pygame surfaces (default) or with SDL2 textures, "
+                             "GPU-accelerated where the system allows")
+    args = parser.parse_args()
+    # Both go into a recording's header (and a tick rate of 0 never steps)
+    if not 1 <= args.tick_rate <= MAX_TICK_RATE:
+        parser.error(f"--tick-rate must be from 1 to {MAX_TICK_RATE}")
+    if args.seed is not None and not 0 <= args.seed <= MAX_SEED:
+        parser.error(f"--seed must be from 0 to {MAX_SEED}")
+    if not 0 < args.render_scale <= 1:
+        parser.error("--render-scale must be above 0 and at most 1")
+    if args.render_scale < 1 and args.dirty_rects:
+        parser.error("--dirty-rects cannot be combined with --render-scale (the playfield is redrawn every frame)")
+    if args.renderer == "texture" and (args.dirty_rects or args.render_scale < 1):
+        parser.error("--dirty-rects and --render-scale only apply to the surface renderer")
+    return args
+
 def main():
-    global ENEMY_SHOOT_CHANCE, ENEMY_ROWS, ENEMY_COLS
-    # Try to load and play background music
-    try:
-        pygame.mixer.music.load("background_music.mp3")
-        pygame.mixer.music.set_volume(0.5)  # Set volume to 50%
-        pygame.mixer.music.play(-1)  # -1 means loop indefinitely
-    except:
-        print("Background music file not found. Continuing without music.")
+    args = parse_args()
+
+    # A replay brings its own seed and tick rate
+    replay = None
+    if args.replay:
+        try:
+            replay = Replay.load(args.replay)
+        except (OSError, ValueError) as error:
+            sys.exit(f"Cannot load replay: {error}")
+        seed, tick_rate = replay.seed, replay.tick_rate
+    else:
+        seed = args.seed if args.seed is not None else random.randrange(2 ** 32)
+        tick_rate = args.tick_rate
+    fast_forward = replay is not None and args.fast_forward
+
+    # Every subsystem draws from its own generator derived from the seed
+    rngs = RandomStreams(seed)
+    init_display(rngs, args.renderer)
+
+    # Load the sounds, music and the other font sizes while the menu is up
+    global report_startup
+    report_startup = args.asset_report
+    if report_startup:
+        atexit.register(print_asset_report)
+    assets.start(font_sizes=[PROFILER_FONT_SIZE, *GAME_OVER_FONT_SIZES])
+    if args.sound_report:
+        atexit.register(print_sound_report)
 
     # Show main menu first
     if not main_menu():
         return  # Exit if player quits from menu
 
     # Initialize game after menu
-    player = Player()
-    enemy_group = EnemyGroup()
-
-    # Create starfield background
-    stars = [Star() for _ in range(100)]
-
-    # Game state
-    game_over = False
-    paused = False
-    last_shot_time = 0
-    shot_cooldown = 300  # milliseconds
-    current_level = 1
-    enemies_killed = 0
-    enemies_to_next_level = 20  # Number of enemies to kill to advance to next level
+    # Frame-time profiler: stages are timed while it is enabled (F3 toggles
+    # it and its overlay)
+    profiler = FrameProfiler(enabled=args.profile or args.profile_csv is not None)
+    if args.profile_csv:
+        profiler.open_csv(args.profile_csv)
+    # Effects quality: fixed from the command line, or adapted to the frame time
+    quality = QualityController(1000 / FPS, None if args.quality == "auto" else args.quality)
+    profiler_overlay = ProfilerOverlay(profiler, assets.font(PROFILER_FONT_SIZE), 1000 / FPS, quality)
+    profiler_overlay.add_footer("text", text_cache)
+
+    if texture_display is not None:
+        presenter = TexturePresenter(texture_display, starfield)
+    elif args.render_scale < 1:
+        presenter = ScaledPresenter(screen, starfield, args.render_scale, args.smooth_scale)
+    elif args.dirty_rects:
+        presenter = DirtyRectPresenter(screen, starfield)
+        profiler_overlay.add_footer("present", presenter)
+    else:
+        presenter = FlipPresenter(screen, starfield)
+
+    game = Game(tick_rate=tick_rate, seed=seed, profiler=profiler)
+    if texture_display is not None:
+        renderer = TextureRenderer(texture_display, rngs.get("renderer"), profiler)
+    else:
+        renderer = Renderer(presenter.playfield, rngs.get("renderer"), profiler)
+    apply_quality(quality.tier, renderer)
+
+    # Record every tick's input; the file is written when the game exits
+    recorder = None
+    if args.record:
+        recorder = InputRecorder(seed, tick_rate)
+        atexit.register(recorder.save, args.record)
+
+    # Fixed-timestep loop: real frame time is banked in the accumulator and
+    # spent in whole simulation ticks; whatever is left over decides how far
+    # between the last two ticks the frame is drawn
+    accumulator = 0
+    fire = False  # A shot requested since the last tick
+    transitions = []  # Running Transition effects
+    clock.tick()
 
     # Main game loop
     running = True
     while running:
+        profiler.begin_frame()
+        accumulator += min(clock.get_time(), MAX_FRAME_TIME)
+
         # Handle events
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 running = False
 
             if event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_SPACE and not game_over:
-                    current_time = pygame.time.get_ticks()
-                    if current_time - last_shot_time > shot_cooldown:
-                        player.shoot()
-                        shoot_sound.play()
-                        last_shot_time = current_time
+                if event.key == pygame.K_SPACE and not game.game_over:
+                    fire = True
+
+                # Show or hide the profiler overlay
+                if event.key == pygame.K_F3:
+                    profiler.toggle()
 
                 # Pause game when P is pressed
                 if event.key == pygame.K_p:
-                    return_to_menu = pause_game()
+                    # The game clock stands still while paused, so power-up
+                    # timers and enemy movement pick up where they left off
+                    game.pause()
+                    pause_start = pygame.time.get_ticks()
+                    return_to_menu = pause_game(presenter)
+                    game.resume()
+                    accumulator = 0
+                    quality.reset_window()
+                    profiler.begin_frame()  # Don't count the pause as input time
+                    # Transitions resume where they were, too
+                    for transition in transitions:
+                        transition.start_time += pygame.time.get_ticks() - pause_start
                     if return_to_menu:
                         # Return to main menu
                         if not main_menu():
+                            profiler.close()
                             return  # Exit if player quits from menu
                         # Initialize game again after returning from menu
-                        player = Player()
-                        # Reset enemy grid to initial values
-                        ENEMY_ROWS = 5  # Reset to initial value
-                        ENEMY_COLS = 10  # Reset to initial value
-                        enemy_group = EnemyGroup()
-                        game_over = False
-                        current_level = 1
-                        enemies_killed = 0
-                        ENEMY_SHOOT_CHANCE = 0.002  # Reset difficulty
+                        # (a replay is abandoned: the game no longer follows it)
+                        game.reset()
+                        if recorder is not None:
+                            recorder.record_reset()
+                        replay = None
+                        fast_forward = False
+                        renderer.reset()
+                        presenter.invalidate()
+                        transitions.clear()
                         continue
 
-        if game_over:
-            # Show game over screen and check if player wants to return to menu
-            return_to_menu = game_over_screen(player)
-
-            if return_to_menu:
-                # Return to main menu
-                if not main_menu():
-                    return  # Exit if player quits from menu
-                # Initialize game again after returning from menu
-                player = Player()
-                # Reset enemy grid to initial values
-                ENEMY_ROWS = 5  # Reset to initial value
-                ENEMY_COLS = 10  # Reset to initial value
-                enemy_group = EnemyGroup()
-                game_over = False
-                current_level = 1
-                enemies_killed = 0
-                ENEMY_SHOOT_CHANCE = 0.002  # Reset difficulty
+        if game.game_over:
+            if replay is not None and replay.next_is_reset():
+                # The recorded session played on: skip the game over screen
+                replay.skip_reset()
             else:
-                # Reset game completely and continue playing from scratch
-                player = Player()
-                # Reset enemy grid to initial values
-                ENEMY_ROWS = 5  # Reset to initial value
-                ENEMY_COLS = 10  # Reset to initial value
-                enemy_group = EnemyGroup()
-                game_over = False
-                current_level = 1
-                enemies_killed = 0
-                ENEMY_SHOOT_CHANCE = 0.002  # Reset difficulty
-
+                # Show game over screen and check if player wants to return to menu
+                replay = None
+                fast_forward = False
+                return_to_menu = game_over_screen(game.player, rngs.get("game_over"), renderer.particles)
+
+                if return_to_menu:
+                    # Return to main menu
+                    if not main_menu():
+                        profiler.close()
+                        return  # Exit if player quits from menu
+
+            # Reset game completely and continue playing from scratch
+            game.reset()
+            if recorder is not None:
+                recorder.record_reset()
+            renderer.reset()
+            presenter.invalidate()
+            transitions.clear()
+            accumulator = 0
+            fire = False
+            clock.tick()
+            quality.reset_window()
             continue
 
-        # Get keyboard state for continuous movement
-        keys = pygame.key.get_pressed()
-        if keys[pygame.K_LEFT]:
-            player.move("left")
-        if keys[pygame.K_RIGHT]:
-            player.move("right")
-
-        # Update game state
-        current_time = pygame.time.get_ticks()
-        player.update_bullets()
-        player.update_power_ups(current_time)
-        enemy_group.move()
-        enemy_group.shoot()
-        enemy_group.update_bullets()
-        enemy_group.update_power_ups()
-
-        # Check collisions
-        # Pass enemies_killed as a list to allow it to be modified by reference
-        enemies_killed_ref = [enemies_killed]
-        game_over = check_collisions(player, enemy_group, enemies_killed_ref)
-        enemies_killed = enemies_killed_ref[0]
-
-        # Check if player should advance to next level
-        if enemies_killed >= enemies_to_next_level:
-            current_level += 1
-            enemies_killed = 0
-
-            # More balanced scaling formula for enemies needed to level up
-            # Uses square root function to make scaling more gradual at higher levels
-            enemies_to_next_level = int(15 + 10 * math.sqrt(current_level))
-
-            # Adjust ENEMY_ROWS and ENEMY_COLS based on level
-            # This will create more enemies as the level increases
-
-            # Increase rows and columns gradually with level, but cap at reasonable values
-            # to prevent the game from becoming too crowded or too difficult
-            ENEMY_ROWS = min(8, 3 + int(math.sqrt(current_level)))
-            ENEMY_COLS = min(12, 8 + int(math.sqrt(current_level)))
-
-            # Create a new wave of enemies with increased difficulty
-            enemy_group = EnemyGroup()
-
-            # More balanced speed scaling - logarithmic to prevent it from becoming too fast
-            # Base speed + logarithmic increase based on level
-            enemy_group.speed = ENEMY_SPEED + 0.5 * math.log(current_level + 1, 2)
-
-            # More balanced shoot chance scaling - logarithmic with a reasonable cap
-            # This makes early levels easier and prevents later levels from becoming impossible
-            ENEMY_SHOOT_CHANCE = min(0.004, 0.001 + 0.0003 * math.log(current_level + 1, 2))
-            # Play level up sound
-            levelup_sound.play()
-
-            # Create a flash effect
-            flash_surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
-            flash_surface.fill(YELLOW)
-            for alpha in range(0, 128, 8):  # Fade in
-                flash_surface.set_alpha(alpha)
-                screen.blit(flash_surface, (0, 0))
-                pygame.display.flip()
-                pygame.time.delay(20)
-
-            # Display level up message
-            screen.fill(BLACK)
-            draw_text(f"LEVEL {current_level}!", YELLOW, SCREEN_WIDTH // 2 - 70, SCREEN_HEIGHT // 2)
-            draw_text("Get ready for more enemies!", WHITE, SCREEN_WIDTH // 2 - 150, SCREEN_HEIGHT // 2 + 50)
-            pygame.display.flip()
-            pygame.time.delay(1500)  # Pause for 1.5 seconds to show level up message
-
-            for alpha in range(128, 0, -8):  # Fade out
-                flash_surface.set_alpha(alpha)
-                screen.fill(BLACK)
-                draw_text(f"LEVEL {current_level}!", YELLOW, SCREEN_WIDTH // 2 - 70, SCREEN_HEIGHT // 2)
-                draw_text("Get ready for more enemies!", WHITE, SCREEN_WIDTH // 2 - 150, SCREEN_HEIGHT // 2 + 50)
-                screen.blit(flash_surface, (0, 0))
-                pygame.display.flip()
-                pygame.time.delay(20)
-
-        # Check if player lost all lives
-        if player.lives <= 0:
-            game_over = True
-
-        # Check if all enemies are destroyed
-        if len(enemy_group.enemies) == 0:
-            # Create a new wave of enemies
-            enemy_group = EnemyGroup()
-            # Increase difficulty slightly (less than level progression)
-            # Use a small logarithmic increase to keep it balanced
-            enemy_group.speed += 0.1 * math.log(current_level + 1, 2)
-            # Slightly increase enemy shoot chance (but less than level progression)
-            # Use a small logarithmic increase to keep it balanced
-            ENEMY_SHOOT_CHANCE = min(0.004, ENEMY_SHOOT_CHANCE + 0.0001 * math.log(current_level + 1, 2))
-
-            # Display wave cleared message
-            screen.fill(BLACK)
-            draw_text("Wave Cleared!", YELLOW, SCREEN_WIDTH // 2 - 80, SCREEN_HEIGHT // 2)
-            draw_text("Get ready for the next wave!", WHITE, SCREEN_WIDTH // 2 - 150, SCREEN_HEIGHT // 2 + 50)
-            pygame.display.flip()
-            pygame.time.delay(1000)  # Pause for 1 second to show message
-
-        # Draw everything
-        screen.fill(BLACK)
+        # Drop transitions that have run their course
+        transitions = [transition for transition in transitions if not transition.finished()]
+        game_held = any(transition.holds_game for transition in transitions)
 
-        # Draw starfield background
-        for star in stars:
-            star.update()
-            star.draw()
-
-        player.draw()
-        enemy_group.draw()
+        # Get keyboard state for continuous movement and run the simulation
+        # for as many whole ticks as the banked time allows
+        keys = pygame.key.get_pressed()
+        events = []
+        if game_held:
+            # The simulation waits for the transition; don't bank time or shots
+            accumulator = 0
+            fire = False
+        profiler.lap("input")
+        if fast_forward:
+            # Run the replay flat out until it is time to show a frame
+            accumulator = 0
+            draw_deadline = time.perf_counter() + FAST_FORWARD_DRAW_INTERVAL / 1000
+        while (accumulator >= game.tick_ms or fast_forward) and not game.game_over:
+            if replay is not None:
+                if replay.step(game) is None:
+                    # The recording has run out: the player takes over from here
+                    replay = None
+                    fast_forward = False
+                    accumulator = 0
+                    break
+            else:
+                move_left, move_right = keys[pygame.K_LEFT], keys[pygame.K_RIGHT]
+                game.step(move_left, move_right, fire)
+                if recorder is not None:
+                    recorder.record(move_left, move_right, fire)
+            fire = False
+            events.extend(game.drain_events())
+            if fast_forward:
+                if time.perf_counter() >= draw_deadline:
+                    break
+            else:
+                accumulator -= game.tick_ms
+
+        # React to what happened during the ticks (a fast-forward skips the
+        # sounds and the transitions that would hold it up)
+        renderer.handle_events(events)
+        if fast_forward:
+            events = []
+        play_event_sounds(events)
+        for kind, x, y, detail in events:
+            if kind == "player_hit":
+                transitions.append(HitFlash())
+            elif kind == "level_up":
+                transitions.append(LevelUpTransition(detail))
+            elif kind == "wave_cleared":
+                transitions.append(WaveClearedTransition())
+        profiler.lap("events")
+
+        # Draw everything, keeping track of where for dirty-rect presentation
+        presenter.begin_frame()
+        dirty_rects = []
+        profiler.lap("background")
+
+        if not any(transition.covers_playfield() for transition in transitions):
+            dirty_rects.extend(renderer.draw(game, 1.0 if fast_forward else accumulator / game.tick_ms))
+        presenter.finish_playfield()
+        profiler.lap("upscale")
 
         # Draw HUD
-        draw_text(f"Score: {player.score}", WHITE, 10, 10)
-        draw_text(f"Lives: {player.lives}", WHITE, SCREEN_WIDTH - 100, 10)
-        draw_text(f"Level: {current_level}", YELLOW, SCREEN_WIDTH // 2 - 40, 10)
+        player = game.player
+        current_time = game.clock.get_ticks()
+        dirty_rects.append(draw_text(f"Score: {player.score}", WHITE, 10, 10))
+        dirty_rects.append(draw_text(f"Lives: {player.lives}", WHITE, SCREEN_WIDTH - 100, 10))
+        dirty_rects.append(draw_text(f"Level: {game.current_level}", YELLOW, SCREEN_WIDTH // 2 - 40, 10))
 
         # Draw level progress bar
         progress_width = 200
         progress_height = 10
         progress_x = SCREEN_WIDTH // 2 - progress_width // 2
         progress_y = 40
-        progress_fill = int((enemies_killed / enemies_to_next_level) * progress_width)
+        progress_fill = int((game.enemies_killed / game.enemies_to_next_level) * progress_width)
 
         # Draw progress bar background
-        pygame.draw.rect(screen, DARK_BLUE, (progress_x, progress_y, progress_width, progress_height))
+        dirty_rects.append(pygame.draw.rect(screen, DARK_BLUE, (progress_x, progress_y, progress_width, progress_height)))
         # Draw progress bar fill
         pygame.draw.rect(screen, GREEN, (progress_x, progress_y, progress_fill, progress_height))
         # Draw progress bar border
@@ -1318,23 +837,44 @@ def main():
 
         # Draw power-up indicators
         if player.has_shield:
-            remaining = max(0, (player.shield_time - current_time) / 1000)
-            draw_text(f"Shield: {remaining:.1f}s", BLUE, 10, 70)
+            remaining = format_countdown(player.shield_time - current_time)
+            dirty_rects.append(draw_text(f"Shield: {remaining}", BLUE, 10, 70))
 
         if player.has_speed_boost:
-            remaining = max(0, (player.speed_boost_time - current_time) / 1000)
-            draw_text(f"Speed: {remaining:.1f}s", CYAN, 10, 100)
+            remaining = format_countdown(player.speed_boost_time - current_time)
+            dirty_rects.append(draw_text(f"Speed: {remaining}", CYAN, 10, 100))
 
         if player.has_weapon_upgrade:
-            remaining = max(0, (player.weapon_upgrade_time - current_time) / 1000)
-            draw_text(f"Weapon: {remaining:.1f}s", RED, 10, 130)
+            remaining = format_countdown(player.weapon_upgrade_time - current_time)
+            dirty_rects.append(draw_text(f"Weapon: {remaining}", RED, 10, 130))
 
-        # Update display
-        pygame.display.flip()
+        # Show that a replay is driving the game
+        if replay is not None:
+            label = "FAST FORWARD" if fast_forward else "REPLAY"
+            dirty_rects.append(draw_text(label, YELLOW, 10, SCREEN_HEIGHT - 40))
 
-        # Cap the frame rate
-        clock.tick(60)
+        # Draw transition effects on top
+        for transition in transitions:
+            dirty_rects.append(transition.draw())
+        profiler.lap("hud")
 
+        if profiler.enabled:
+            dirty_rects.append(profiler_overlay.draw(screen))
+            profiler.lap("overlay")
+
+        # Update display
+        presenter.present(dirty_rects)
+        profiler.lap("present")
+
+        # Cap the frame rate (not while fast-forwarding) and adapt the
+        # effects quality to how long the frame took
+        frame_time = clock.tick(0 if fast_forward else FPS)
+        if not fast_forward and quality.update(frame_time, clock.get_rawtime()):
+            apply_quality(quality.tier, renderer)
+        profiler.lap("wait")
+        profiler.end_frame()
+
+    profiler.close()
     pygame.quit()
     sys.exit()
 
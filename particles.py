@@ -0,0 +1,163 @@
+# Particle effects: one engine for thruster exhaust, tentacle drips,
+# explosions and the game over burst.
+#
+# Particles live in preallocated arrays (NumPy, or array('f') without it) for
+# position, velocity, size, shrink rate, lifetime and style. Ageing and
+# culling is one pass over the arrays, and drawing is a single batched blit
+# of pre-rendered circle stamps, one per style and whole-pixel radius.
+import pygame
+
+from arrays import allocate_array, np
+from surfaces import display_format
+
+PARTICLE_CAPACITY = 2048  # Default limit on live particles per system
+
+def render_particle_stamp(color, core_color, core_inset, radius):
+    # Render a filled circle (optionally with a smaller core) centred on the stamp
+    size = radius * 2 + 1
+    stamp = pygame.Surface((size, size), pygame.SRCALPHA)
+    pygame.draw.circle(stamp, color, (radius, radius), radius)
+    if core_color is not None and radius - core_inset > 0:
+        pygame.draw.circle(stamp, core_color, (radius, radius), radius - core_inset)
+    return display_format(stamp)
+
+class ParticleSystem:
+    # A fixed-capacity pool of particles. Once it is full new particles are
+    # dropped (and counted) rather than growing the arrays.
+    #
+    # Each particle is drawn as a circle of its style's colour with a radius
+    # of int(size); it expires when its lifetime runs out or its size
+    # reaches zero. Call update() once per frame to move and age everything.
+    def __init__(self, capacity=PARTICLE_CAPACITY):
+        self.capacity = capacity
+        self.count = 0
+        self.dropped = 0  # Particles refused because the pool was full
+        self.xs = allocate_array(capacity)
+        self.ys = allocate_array(capacity)
+        self.dxs = allocate_array(capacity)
+        self.dys = allocate_array(capacity)
+        self.sizes = allocate_array(capacity)
+        self.shrinks = allocate_array(capacity)
+        self.lifetimes = allocate_array(capacity)
+        self.styles = allocate_array(capacity)
+        self.style_specs = []  # (color, core_color, core_inset) per style index
+        self.style_indexes = {}
+        self.stamps = {}  # (style, radius) -> pre-rendered stamp
+
+    def __len__(self):
+        return self.count
+
+    def style(self, color, core_color=None, core_inset=3):
+        # Index of the drawing style for a colour (and optional inner core)
+        key = (color, core_color, core_inset)
+        index = self.style_indexes.get(key)
+        if index is None:
+            index = len(self.style_specs)
+            self.style_specs.append(key)
+            self.style_indexes[key] = index
+        return index
+
+    def emit(self, x, y, size, lifetime, style, dx=0, dy=0, shrink=0):
+        # Add one particle; returns False if the pool is full
+        i = self.count
+        if i == self.capacity:
+            self.dropped += 1
+            return False
+        self.xs[i] = x
+        self.ys[i] = y
+        self.dxs[i] = dx
+        self.dys[i] = dy
+        self.sizes[i] = size
+        self.shrinks[i] = shrink
+        self.lifetimes[i] = lifetime
+        self.styles[i] = style
+        self.count = i + 1
+        return True
+
+    def clear(self):
+        self.count = 0
+
+    def update(self):
+        # Move, shrink and age every particle, then drop the expired ones
+        count = self.count
+        if count == 0:
+            return
+        if np is not None:
+            self.xs[:count] += self.dxs[:count]
+            self.ys[:count] += self.dys[:count]
+            self.sizes[:count] -= self.shrinks[:count]
+            self.lifetimes[:count] -= 1
+            keep = (self.lifetimes[:count] > 0) & (self.sizes[:count] > 0)
+            if not keep.all():
+                kept = np.flatnonzero(keep)
+                self.count = len(kept)
+                for column in (self.xs, self.ys, self.dxs, self.dys, self.sizes,
+                               self.shrinks, self.lifetimes, self.styles):
+                    column[:self.count] = column[kept]
+            return
+
+        # Pure Python fallback: compact the survivors towards the front
+        columns = (self.xs, self.ys, self.dxs, self.dys, self.sizes,
+                   self.shrinks, self.lifetimes, self.styles)
+        xs, ys, dxs, dys, sizes, shrinks, lifetimes, styles = columns
+        write = 0
+        for read in range(count):
+            size = sizes[read] - shrinks[read]
+            lifetime = lifetimes[read] - 1
+            if lifetime > 0 and size > 0:
+                xs[write] = xs[read] + dxs[read]
+                ys[write] = ys[read] + dys[read]
+                dxs[write] = dxs[read]
+                dys[write] = dys[read]
+                sizes[write] = size
+                shrinks[write] = shrinks[read]
+                lifetimes[write] = lifetime
+                styles[write] = styles[read]
+                write += 1
+        self.count = write
+
+    def get_stamp(self, style, radius):
+        key = (style, radius)
+        stamp = self.stamps.get(key)
+        if stamp is None:
+            stamp = render_particle_stamp(*self.style_specs[style], radius)
+            self.stamps[key] = stamp
+        return stamp
+
+    def draw(self, surface, scale=1.0):
+        # Stamp every live particle in one batched blit; returns the drawn
+        # rects
+        return surface.blits(self.stamps_at(scale))
+
+    def stamps_at(self, scale=1.0):
+        # (stamp, top-left) of every live particle that shows up. Positions
+        # and sizes are multiplied by scale (for a scaled-down playfield); a
+        # particle that shows at full size keeps at least a 1px radius.
+        count = self.count
+        if count == 0:
+            return []
+        if np is not None:
+            xs = (self.xs[:count] * scale).astype(np.int32).tolist()
+            ys = (self.ys[:count] * scale).astype(np.int32).tolist()
+            sizes = self.sizes[:count]
+            if scale == 1:
+                radii = sizes.astype(np.int32).tolist()
+            else:
+                radii = np.where(sizes >= 1, np.maximum((sizes * scale).astype(np.int32), 1), 0).tolist()
+            styles = self.styles[:count].astype(np.int32).tolist()
+        else:
+            xs = [int(x * scale) for x in self.xs[:count]]
+            ys = [int(y * scale) for y in self.ys[:count]]
+            radii = [max(int(size * scale), 1) if size >= 1 else 0 for size in self.sizes[:count]]
+            styles = [int(style) for style in self.styles[:count]]
+
+        stamps = self.stamps
+        blits = []
+        for x, y, radius, style in zip(xs, ys, radii, styles):
+            if radius <= 0:
+                continue  # Too small to show up
+            stamp = stamps.get((style, radius))
+            if stamp is None:
+                stamp = self.get_stamp(style, radius)
+            blits.append((stamp, (x - radius, y - radius)))
+        return blits
@@ -0,0 +1,145 @@
+# Frame-time profiling: where each frame of the main loop goes.
+#
+# Stages are timed with laps rather than nested scopes: begin_frame() starts
+# the clock and every lap(stage) charges the time since the previous mark to
+# that stage. The main loop, Game.step() and Renderer.draw() call lap() in
+# sequence, so each frame is split into consecutive stages that add up to
+# the whole frame. A stage that runs several times in a frame (a simulation
+# stage when the frame catches up several ticks) accumulates.
+#
+# Nothing in here touches pygame; the overlay is drawn by render.py.
+import csv
+from collections import deque
+from time import perf_counter_ns
+
+# Stages in main-loop order (also the CSV column order)
+PROFILE_STAGES = (
+    "input",          # Event handling and keyboard state
+    "player",         # Player movement, shooting and power-up timers
+    "enemy_move",     # EnemyGroup.move
+    "enemy_shoot",    # EnemyGroup.shoot
+    "bullets",        # Enemy bullets and falling power-ups
+    "collisions",     # check_collisions and level progression
+    "events",         # Sounds, explosions and transitions for the tick events
+    "background",     # Clearing and the starfield
+    "player_draw",    # Ship, shield, thrusters and player bullets
+    "enemy_draw",     # Formation and enemy bullets
+    "particles",      # Particle batch draw and ageing
+    "power_up_draw",  # Power-ups
+    "upscale",        # Scaling a reduced-resolution playfield up to the screen
+    "hud",            # Score, lives, level bar, power-up timers, transitions
+    "overlay",        # This profiler's own overlay
+    "present",        # display.flip / display.update
+    "wait",           # Frame cap sleep in clock.tick
+)
+PROFILE_WINDOW = 120  # Frames kept for the rolling statistics
+
+class NullProfiler:
+    # Stand-in used when nothing is being profiled; every call is a no-op
+    enabled = False
+
+    def begin_frame(self):
+        pass
+
+    def lap(self, stage):
+        pass
+
+    def end_frame(self):
+        pass
+
+class FrameProfiler:
+    # Collects per-stage times for each frame while enabled. The last
+    # `window` frames are kept for mean/p95/max; every frame can also be
+    # written to a CSV file (one row per frame, times in milliseconds).
+    def __init__(self, stages=PROFILE_STAGES, window=PROFILE_WINDOW, enabled=False):
+        self.stages = list(stages)
+        self.enabled = enabled
+        self.current = dict.fromkeys(self.stages, 0)  # Nanoseconds in this frame
+        self.history = {stage: deque(maxlen=window) for stage in self.stages}
+        self.frame_times = deque(maxlen=window)  # Whole-frame milliseconds
+        self.work_times = deque(maxlen=window)  # Frame milliseconds minus the wait stage
+        self.frames = 0
+        self.last_mark = 0
+        self.frame_start = 0
+        self.csv_file = None
+        self.csv_writer = None
+        self.csv_stages = []
+
+    def toggle(self):
+        self.enabled = not self.enabled
+        if self.enabled:
+            # Don't charge the time spent disabled to the next lap
+            self.begin_frame()
+
+    def open_csv(self, path):
+        # Start writing every profiled frame to a CSV file
+        self.csv_file = open(path, "w", newline="")
+        self.csv_writer = csv.writer(self.csv_file)
+        self.csv_stages = list(self.stages)
+        self.csv_writer.writerow(["frame", "frame_ms"] + [f"{stage}_ms" for stage in self.csv_stages])
+
+    def close(self):
+        if self.csv_file is not None:
+            self.csv_file.close()
+            self.csv_file = None
+            self.csv_writer = None
+
+    def begin_frame(self):
+        if not self.enabled:
+            return
+        now = perf_counter_ns()
+        self.frame_start = self.last_mark = now
+        current = self.current
+        for stage in current:
+            current[stage] = 0
+
+    def lap(self, stage):
+        # Charge the time since the previous mark to stage
+        if not self.enabled:
+            return
+        now = perf_counter_ns()
+        current = self.current
+        if stage not in current:
+            # Unlisted stages are tracked too, after the known ones
+            self.stages.append(stage)
+            self.history[stage] = deque(maxlen=self.frame_times.maxlen)
+            current[stage] = 0
+        current[stage] += now - self.last_mark
+        self.last_mark = now
+
+    def end_frame(self):
+        if not self.enabled:
+            return
+        frame_ms = (perf_counter_ns() - self.frame_start) / 1e6
+        self.frame_times.append(frame_ms)
+        self.work_times.append(frame_ms - self.current.get("wait", 0) / 1e6)
+        for stage, elapsed in self.current.items():
+            self.history[stage].append(elapsed / 1e6)
+        if self.csv_writer is not None:
+            self.csv_writer.writerow([self.frames, f"{frame_ms:.4f}"] +
+                                     [f"{self.current[stage] / 1e6:.4f}" for stage in self.csv_stages])
+        self.frames += 1
+
+    def stats(self):
+        # (stage, mean, p95, max) in milliseconds over the rolling window
+        rows = []
+        for stage in self.stages:
+            times = self.history[stage]
+            if times:
+                rows.append((stage, *summarize(times)))
+        return rows
+
+    def histogram(self, bucket_ms, buckets):
+        # Counts of frame work times (without the frame-cap wait) over the
+        # window, in buckets of bucket_ms; the last bucket also takes
+        # everything slower
+        counts = [0] * buckets
+        for work_ms in self.work_times:
+            counts[min(buckets - 1, int(work_ms / bucket_ms))] += 1
+        return counts
+
+def summarize(times):
+    # Mean, 95th percentile and maximum of a sequence of times
+    ordered = sorted(times)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    return sum(ordered) / len(ordered), p95, ordered[-1]
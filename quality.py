@@ -0,0 +1,86 @@
+# Adaptive render quality: effects are shed in tiers when frames run over
+# budget and brought back once there is headroom again.
+#
+# The controller watches two numbers from the frame clock each frame: the
+# frame time clock.tick() returns (what the player sees) and the work time
+# before the frame-cap wait (clock.get_rawtime(), which shows the headroom
+# the capped frame time hides). It steps down a tier when the mean frame
+# time over QUALITY_WINDOW frames is past the budget by QUALITY_DEGRADE_RATIO,
+# and steps back up only when the work time has stayed well inside the
+# budget (QUALITY_RESTORE_RATIO) for the longer QUALITY_RESTORE_WINDOW. The
+# gap between the two thresholds, and starting each tier with empty windows,
+# keeps it from flapping between tiers.
+#
+# Nothing in here touches pygame; the Renderer and the starfield apply the
+# tier's settings.
+from collections import deque
+
+# Tiers from best to cheapest:
+#   enemy_glow: enemy sprites with their translucent glow (without it they
+#     are baked opaque with a colour key, a much cheaper blit)
+#   particle_rate: multiplier on the thruster and tentacle particle spawn chances
+#   bullet_glow: player bullets with their glow (else plain circles) and
+#     enemy bullets with their tail
+#   star_layers: starfield parallax layers drawn (the nearest ones are kept)
+QUALITY_TIERS = [
+    {"name": "high", "enemy_glow": True, "particle_rate": 1.0, "bullet_glow": True, "star_layers": 3},
+    {"name": "medium", "enemy_glow": False, "particle_rate": 0.5, "bullet_glow": True, "star_layers": 3},
+    {"name": "low", "enemy_glow": False, "particle_rate": 0.25, "bullet_glow": False, "star_layers": 2},
+    {"name": "minimal", "enemy_glow": False, "particle_rate": 0.0, "bullet_glow": False, "star_layers": 1},
+]
+QUALITY_NAMES = [tier["name"] for tier in QUALITY_TIERS]
+
+QUALITY_WINDOW = 60  # Frames averaged before stepping down
+QUALITY_RESTORE_WINDOW = 180  # Frames of headroom needed before stepping up
+QUALITY_DEGRADE_RATIO = 1.1  # Step down when frames take this much of the budget
+QUALITY_RESTORE_RATIO = 0.5  # Step up when work takes less than this much of it
+
+class QualityController:
+    # Picks the quality tier from frame times; a forced tier (by name) never
+    # changes
+    def __init__(self, budget_ms, forced=None):
+        self.budget_ms = budget_ms
+        self.forced = forced is not None
+        self.index = QUALITY_NAMES.index(forced) if forced is not None else 0
+        self.frame_times = deque(maxlen=QUALITY_WINDOW)
+        self.work_times = deque(maxlen=QUALITY_RESTORE_WINDOW)
+        self.changes = 0
+
+    @property
+    def tier(self):
+        return QUALITY_TIERS[self.index]
+
+    def describe(self):
+        if self.forced:
+            return f"{self.tier['name']} (forced)"
+        return f"{self.tier['name']} (auto, {self.changes} changes)"
+
+    def update(self, frame_ms, work_ms):
+        # Feed one frame's times; returns True when the tier changed
+        if self.forced:
+            return False
+        self.frame_times.append(frame_ms)
+        self.work_times.append(work_ms)
+
+        index = self.index
+        if (len(self.frame_times) == QUALITY_WINDOW and index < len(QUALITY_TIERS) - 1 and
+                sum(self.frame_times) / QUALITY_WINDOW > self.budget_ms * QUALITY_DEGRADE_RATIO):
+            index += 1
+        elif (len(self.work_times) == QUALITY_RESTORE_WINDOW and index > 0 and
+                sum(self.work_times) / QUALITY_RESTORE_WINDOW < self.budget_ms * QUALITY_RESTORE_RATIO):
+            index -= 1
+        else:
+            return False
+
+        # Judge the new tier on its own frames only
+        self.index = index
+        self.frame_times.clear()
+        self.work_times.clear()
+        self.changes += 1
+        return True
+
+    def reset_window(self):
+        # Forget the frames so far (after a pause or a hitch that says
+        # nothing about rendering cost)
+        self.frame_times.clear()
+        self.work_times.clear()
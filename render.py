@@ -0,0 +1,985 @@
+# Rendering of the game simulation: sprite caches and the playfield renderer.
+#
+# Everything here only reads simulation state. Animation phases, particles
+# and explosions are purely visual and are owned by the Renderer, so the
+# simulation runs the same whether or not anything is drawn.
+import math
+import random
+import weakref
+from collections import OrderedDict
+
+import pygame
+
+from particles import ParticleSystem
+from profiler import NullProfiler
+from quality import QUALITY_TIERS
+from simulation import SCREEN_WIDTH, SCREEN_HEIGHT, ENEMY_SPACING
+from surfaces import display_format
+
+# Colors
+WHITE = (255, 255, 255)
+BLACK = (0, 0, 0)
+RED = (255, 0, 0)
+GREEN = (0, 255, 0)
+BLUE = (0, 0, 255)
+YELLOW = (255, 255, 0)
+PURPLE = (128, 0, 128)
+CYAN = (0, 255, 255)
+ORANGE = (255, 165, 0)
+DARK_BLUE = (0, 0, 128)
+LIGHT_BLUE = (173, 216, 230)
+
+# Body and glow colours for each enemy row (rows past the end reuse the last entry)
+ENEMY_ROW_COLORS = [
+    (PURPLE, (180, 100, 255)),  # Light purple glow
+    (RED, (255, 100, 100)),     # Light red glow
+    (ORANGE, (255, 180, 100)),  # Light orange glow
+    (YELLOW, (255, 255, 100)),  # Light yellow glow
+    (GREEN, (100, 255, 100)),   # Light green glow
+]
+
+# Player ship colours
+PLAYER_COLOR = CYAN
+PLAYER_ACCENT_COLOR = BLUE
+PLAYER_ENGINE_COLOR = ORANGE
+
+# Power-up colours by type
+POWER_UP_COLORS = {
+    "speed": CYAN,   # Speed boost - cyan
+    "weapon": RED,   # Weapon upgrade - red
+    "shield": BLUE,  # Shield - blue
+    "life": GREEN,   # Extra life - green
+}
+
+# Enemy sprite cache settings
+ENEMY_ANIMATION_FRAMES = 20  # Quantised animation_state phases per enemy look
+ENEMY_PULSE_FRAMES = 5       # Quantised pulse_size phases per enemy look
+ENEMY_SPRITE_MARGIN = 10     # Padding around the body for the glow
+ENEMY_TENTACLE_REACH = 22    # Extra height below the body for tentacles
+
+# Player sprite cache settings
+PLAYER_SPRITE_MARGIN_X = 25  # Wings stick out this far on each side
+PLAYER_SPRITE_MARGIN_TOP = 20  # The nose sits this far above the player's y
+PLAYER_FLAME_REACH = 33      # Longest flame (boosted, max flicker) below the hull
+SHIELD_ALPHA_STEP = 8        # Shield rings are pre-rendered every 8 alpha levels
+BULLET_STAMP_RADIUS = 7      # Half the size of a pre-rendered player bullet stamp
+SPRITE_COLORKEY = (255, 0, 255)  # Transparent colour of opaque (no glow) sprites
+POWER_UP_SPRITE_RADIUS = 15  # Largest pulse of a power-up (10 plus up to 5)
+
+# Dirty-rect presentation settings
+DIRTY_AREA_LIMIT = 0.5       # Flip the whole screen once this fraction of it is dirty
+DIRTY_TILE_SIZE = 32         # Dirty area is measured in tiles of this many pixels square
+
+# Profiler overlay settings
+PROFILE_OVERLAY_REFRESH = 15  # Frames between redraws of the overlay panel
+PROFILE_HISTOGRAM_BUCKET = 2  # Milliseconds per frame-time histogram bar
+PROFILE_HISTOGRAM_BUCKETS = 12  # Bars (the last one takes every slower frame)
+
+# Text cache settings
+TEXT_CACHE_SIZE = 256        # Rendered strings kept before the least recently used is dropped
+
+# Starfield settings
+STAR_COUNT = 150
+STAR_SPEED_BANDS = [0.15, 0.3, 0.45]  # Scroll speed (px/frame) of each parallax layer
+
+class Starfield:
+    # Background stars baked into one screen-sized layer per speed band. Each
+    # frame a layer is scrolled down by its speed and drawn with two blits
+    # (the wrapped part fills the top), instead of a draw call per star.
+    # A single instance is shared by every screen so the field carries on
+    # smoothly across menus, play and game over. Lower quality tiers draw
+    # fewer layers (visible_layers), dropping the slow, distant ones first.
+    # Drawn onto a smaller surface (a scaled-down playfield) it uses copies of
+    # the layers scaled to fit, made on first use.
+    def __init__(self, count=STAR_COUNT, rng=None):
+        rng = rng if rng is not None else random.Random()
+        self.layers = [pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT)) for _ in STAR_SPEED_BANDS]
+        self.offsets = [0.0] * len(STAR_SPEED_BANDS)
+        self.visible_layers = len(self.layers)
+        self.scaled_layers = {}  # Surface size -> layers scaled to it
+        self.stars = []  # (x, y, size, color, layer index), for drawing stars one by one
+
+        for _ in range(count):
+            x = rng.randint(0, SCREEN_WIDTH)
+            y = rng.randint(0, SCREEN_HEIGHT)
+            size = rng.randint(1, 3)
+            color = rng.choice([WHITE, LIGHT_BLUE, CYAN])
+            index = rng.randrange(len(self.layers))
+            layer = self.layers[index]
+            self.stars.append((x, y, size, color, index))
+            # Stars on the seam are drawn at both ends so the wrap is invisible
+            for wrap_y in (y - SCREEN_HEIGHT, y, y + SCREEN_HEIGHT):
+                pygame.draw.circle(layer, color, (x, wrap_y), size)
+
+        # The layers are almost entirely black: run-length encoding the colour
+        # key lets a blit skip the empty runs, so a full-screen layer costs
+        # less than drawing its stars one by one
+        for i, layer in enumerate(self.layers):
+            layer = display_format(layer, alpha=False)
+            layer.set_colorkey(BLACK, pygame.RLEACCEL)
+            self.layers[i] = layer
+
+    def update(self):
+        for i, speed in enumerate(STAR_SPEED_BANDS):
+            self.offsets[i] = (self.offsets[i] + speed) % SCREEN_HEIGHT
+
+    def layers_for(self, size):
+        if size == (SCREEN_WIDTH, SCREEN_HEIGHT):
+            return self.layers
+        layers = self.scaled_layers.get(size)
+        if layers is None:
+            # Smooth scaling keeps the smallest stars (dimmed) instead of
+            # dropping every other pixel
+            layers = [pygame.transform.smoothscale(layer, size) for layer in self.layers]
+            for layer in layers:
+                layer.set_colorkey(BLACK, pygame.RLEACCEL)
+            self.scaled_layers[size] = layers
+        return layers
+
+    def draw(self, surface):
+        height = surface.get_height()
+        scale = height / SCREEN_HEIGHT
+        layers = self.layers_for(surface.get_size())
+        first = len(layers) - self.visible_layers
+        for layer, offset in zip(layers[first:], self.offsets[first:]):
+            y = int(offset * scale)
+            surface.blit(layer, (0, y))
+            surface.blit(layer, (0, y - height))
+
+def render_player_frame(width, height, color, accent_color, engine_color, speed_boost, engine_flicker):
+    # Render the ship body and engine flames for one visual state and flicker frame.
+    # The player's (x, y) maps to (PLAYER_SPRITE_MARGIN_X, PLAYER_SPRITE_MARGIN_TOP).
+    x = PLAYER_SPRITE_MARGIN_X
+    y = PLAYER_SPRITE_MARGIN_TOP
+    frame = pygame.Surface((width + PLAYER_SPRITE_MARGIN_X * 2,
+                            PLAYER_SPRITE_MARGIN_TOP + height + PLAYER_FLAME_REACH),
+                           pygame.SRCALPHA)
+
+    # Draw player ship body with color change if speed boost is active
+    ship_color = YELLOW if speed_boost else color
+    highlight_color = WHITE if speed_boost else LIGHT_BLUE
+
+    # Draw main hull
+    pygame.draw.polygon(frame, ship_color, [
+        (x + width // 2, y - 20),  # Nose
+        (x, y + height - 10),      # Bottom left
+        (x + width, y + height - 10)  # Bottom right
+    ])
+
+    # Draw hull highlight
+    pygame.draw.polygon(frame, highlight_color, [
+        (x + width // 2, y - 20),  # Nose
+        (x + width // 2 - 10, y + 10),  # Left middle
+        (x + width // 2 + 10, y + 10)   # Right middle
+    ], 1)
+
+    # Draw cockpit (more detailed)
+    pygame.draw.ellipse(frame, accent_color, 
+                       (x + width // 2 - 12, y, 24, 30))
+    # Cockpit glass reflection
+    pygame.draw.ellipse(frame, highlight_color, 
+                       (x + width // 2 - 8, y + 5, 16, 10), 1)
+
+    # Draw wings (more detailed)
+    # Left wing
+    pygame.draw.polygon(frame, ship_color, [
+        (x, y + height - 10),       # Top left
+        (x - 25, y + height + 15),  # Bottom left
+        (x + 20, y + height - 10)   # Bottom right
+    ])
+    # Left wing detail
+    pygame.draw.line(frame, highlight_color, 
+                    (x, y + height - 5),
+                    (x - 15, y + height + 10), 2)
+
+    # Right wing
+    pygame.draw.polygon(frame, ship_color, [
+        (x + width, y + height - 10),  # Top right
+        (x + width + 25, y + height + 15), # Bottom right
+        (x + width - 20, y + height - 10)   # Bottom left
+    ])
+    # Right wing detail
+    pygame.draw.line(frame, highlight_color, 
+                    (x + width, y + height - 5),
+                    (x + width + 15, y + height + 10), 2)
+
+    # Draw engine flames (with enhanced animation)
+    flame_height = 15 + engine_flicker
+
+    # Bigger flames if speed boost is active
+    if speed_boost:
+        flame_height += 10
+        flame_color = WHITE  # Hotter flame color
+        inner_flame_color = LIGHT_BLUE
+    else:
+        flame_color = engine_color
+        inner_flame_color = YELLOW
+
+    # Left engine
+    pygame.draw.polygon(frame, flame_color, [
+        (x + 20, y + height - 10),
+        (x + 10, y + height + flame_height),
+        (x + 30, y + height - 10)
+    ])
+    # Inner flame
+    pygame.draw.polygon(frame, inner_flame_color, [
+        (x + 20, y + height - 5),
+        (x + 15, y + height + flame_height - 10),
+        (x + 25, y + height - 5)
+    ])
+
+    # Right engine
+    pygame.draw.polygon(frame, flame_color, [
+        (x + width - 20, y + height - 10),
+        (x + width - 10, y + height + flame_height),
+        (x + width - 30, y + height - 10)
+    ])
+    # Inner flame
+    pygame.draw.polygon(frame, inner_flame_color, [
+        (x + width - 20, y + height - 5),
+        (x + width - 15, y + height + flame_height - 10),
+        (x + width - 25, y + height - 5)
+    ])
+
+    return display_format(frame)
+
+def render_shield_frame(shield_radius, shield_alpha):
+    # Render the shield bubble as a 5-ring alpha gradient
+    frame = pygame.Surface((shield_radius * 2, shield_radius * 2), pygame.SRCALPHA)
+    for r in range(shield_radius, shield_radius - 5, -1):
+        alpha = max(0, min(255, shield_alpha - (shield_radius - r) * 10))
+        pygame.draw.circle(frame, (0, 100, 255, alpha), 
+                          (shield_radius, shield_radius), r, 2)
+    return display_format(frame)
+
+class PlayerSpriteCache:
+    # Pre-rendered player ship frames: one per speed-boost state and engine_flicker
+    # value (16 in total), plus the shield bubble at quantised shield_alpha levels.
+    def __init__(self):
+        self.ships = {}
+        self.shields = {}
+
+    def get_ship(self, player, engine_flicker):
+        key = (player.width, player.height, PLAYER_COLOR, PLAYER_ACCENT_COLOR,
+               PLAYER_ENGINE_COLOR, player.has_speed_boost, engine_flicker)
+        frame = self.ships.get(key)
+        if frame is None:
+            frame = render_player_frame(*key)
+            self.ships[key] = frame
+        return frame
+
+    def get_shield(self, shield_radius, shield_alpha):
+        key = (shield_radius, int(shield_alpha) // SHIELD_ALPHA_STEP * SHIELD_ALPHA_STEP)
+        frame = self.shields.get(key)
+        if frame is None:
+            frame = render_shield_frame(*key)
+            self.shields[key] = frame
+        return frame
+
+    def invalidate(self):
+        self.ships.clear()
+        self.shields.clear()
+
+player_sprites = PlayerSpriteCache()
+
+def bake_colorkey(sprite):
+    # Copy a sprite whose pixels are all either opaque or fully transparent
+    # onto a colour-keyed surface: an RLE colour-key blit is much cheaper
+    # than blending per-pixel alpha
+    keyed = pygame.Surface(sprite.get_size())
+    keyed.fill(SPRITE_COLORKEY)
+    keyed.blit(sprite, (0, 0))
+    keyed = display_format(keyed, alpha=False)
+    keyed.set_colorkey(SPRITE_COLORKEY, pygame.RLEACCEL)
+    return keyed
+
+def render_bullet_stamp(glow_color, bullet_color, inner_color, glow=True):
+    # Render a player bullet (translucent glow with a solid core) centred on
+    # the stamp; without the glow it is a plain opaque circle
+    size = BULLET_STAMP_RADIUS * 2
+    center = (BULLET_STAMP_RADIUS, BULLET_STAMP_RADIUS)
+    stamp = pygame.Surface((size, size), pygame.SRCALPHA)
+    if glow:
+        pygame.draw.circle(stamp, glow_color, center, 6)
+    pygame.draw.circle(stamp, bullet_color, center, 4)
+    pygame.draw.circle(stamp, inner_color, center, 2)
+    if not glow:
+        return bake_colorkey(stamp)
+    return display_format(stamp)
+
+class BulletStampPool:
+    # One shared stamp per bullet colour scheme, reused by every live bullet
+    # instead of allocating a glow surface per bullet per frame
+    def __init__(self):
+        self.stamps = {}
+
+    def get(self, glow_color, bullet_color, inner_color, glow=True):
+        key = (glow_color, bullet_color, inner_color, glow)
+        stamp = self.stamps.get(key)
+        if stamp is None:
+            stamp = render_bullet_stamp(glow_color, bullet_color, inner_color, glow)
+            self.stamps[key] = stamp
+        return stamp
+
+    def invalidate(self):
+        self.stamps.clear()
+
+bullet_stamps = BulletStampPool()
+
+def render_enemy_frame(color, glow_color, width, height, pulse_size, animation_state, glow=True):
+    # Render one animation frame of an enemy onto its own transparent surface.
+    # The body's top-left corner sits at (ENEMY_SPRITE_MARGIN, ENEMY_SPRITE_MARGIN).
+    # Without the glow every pixel is opaque or transparent, so the frame is
+    # baked onto a colour-keyed surface.
+    pulse_width = width + pulse_size * 2
+    pulse_height = height + pulse_size * 2
+    x = y = ENEMY_SPRITE_MARGIN
+    frame = pygame.Surface((int(width + 2 + ENEMY_SPRITE_MARGIN * 2),
+                            int(height + 2 + ENEMY_SPRITE_MARGIN + ENEMY_TENTACLE_REACH)),
+                           pygame.SRCALPHA)
+
+    # Draw glow effect
+    if glow:
+        pygame.draw.ellipse(frame, (*glow_color, 100), 
+                           (x, y, int(pulse_width), int(pulse_height)))
+
+    # Draw the main body
+    pygame.draw.ellipse(frame, color, 
+                       (x, y, int(pulse_width), int(pulse_height)))
+
+    # Draw body pattern/texture
+    pattern_color = tuple(min(255, c + 50) for c in color)
+    for i in range(3):
+        pygame.draw.ellipse(frame, pattern_color, 
+                           (int(x + pulse_width/4 + i*10), 
+                            int(y + pulse_height/3), 
+                            int(pulse_width/6), int(pulse_height/4)), 
+                           1)
+
+    # Draw the eyes (larger and more detailed)
+    eye_color = WHITE
+    eye_size = 8
+    left_eye_x = int(x + pulse_width/4)
+    right_eye_x = int(x + 3*pulse_width/4)
+    eye_y = int(y + pulse_height/3)
+
+    # Eye whites
+    pygame.draw.circle(frame, eye_color, (left_eye_x, eye_y), eye_size)
+    pygame.draw.circle(frame, eye_color, (right_eye_x, eye_y), eye_size)
+
+    # Eye highlights
+    pygame.draw.circle(frame, (200, 200, 255), 
+                      (left_eye_x - 2, eye_y - 2), 2)
+    pygame.draw.circle(frame, (200, 200, 255), 
+                      (right_eye_x - 2, eye_y - 2), 2)
+
+    # Draw pupils (they move for animation)
+    pupil_offset = 3 * math.sin(animation_state * math.pi)
+    pupil_size = 3
+    pygame.draw.circle(frame, BLACK, 
+                      (int(left_eye_x + pupil_offset), eye_y), pupil_size)
+    pygame.draw.circle(frame, BLACK, 
+                      (int(right_eye_x + pupil_offset), eye_y), pupil_size)
+
+    # Draw tentacles with improved animation
+    tentacle_count = 5
+    tentacle_spacing = pulse_width / (tentacle_count + 1)
+    tentacle_base_height = 8 + 4 * math.sin(animation_state * math.pi * 2)
+
+    for i in range(tentacle_count):
+        # Calculate tentacle position with wave effect
+        x_pos = x + (i + 1) * tentacle_spacing
+        wave_offset = 3 * math.sin(animation_state * math.pi * 2 + i)
+
+        # Draw main tentacle
+        tentacle_height = tentacle_base_height + i % 3 * 2
+        pygame.draw.line(frame, color, 
+                        (x_pos, y + pulse_height),
+                        (x_pos + wave_offset, y + pulse_height + tentacle_height), 
+                        4)
+
+        # Draw tentacle suction cup
+        pygame.draw.circle(frame, pattern_color, 
+                          (int(x_pos + wave_offset), 
+                           int(y + pulse_height + tentacle_height)), 
+                          3)
+
+    if not glow:
+        return bake_colorkey(frame)
+    return display_format(frame)
+
+class EnemySpriteCache:
+    # Pre-rendered enemy frames, so drawing an enemy is a single blit instead of
+    # ~30 primitive draws. Frames are rendered lazily and keyed by the row colours,
+    # the enemy size and the quantised pulse/animation phase (and whether it has
+    # its glow), so a frame is only rendered again when the colour table or
+    # enemy sizes change.
+    def __init__(self):
+        self.frames = {}
+
+    def get(self, color, glow_color, width, height, pulse_size, animation_state, glow=True):
+        # Quantise the animation state to the nearest cached phase
+        pulse_index = int((pulse_size + 1) / 2 * (ENEMY_PULSE_FRAMES - 1) + 0.5)
+        animation_index = int(animation_state / 2 * ENEMY_ANIMATION_FRAMES + 0.5) % ENEMY_ANIMATION_FRAMES
+        key = (color, glow_color, width, height, pulse_index, animation_index, glow)
+
+        frame = self.frames.get(key)
+        if frame is None:
+            pulse_size = pulse_index * 2 / (ENEMY_PULSE_FRAMES - 1) - 1
+            animation_state = animation_index * 2 / ENEMY_ANIMATION_FRAMES
+            frame = render_enemy_frame(color, glow_color, width, height,
+                                       pulse_size, animation_state, glow)
+            self.frames[key] = frame
+        return frame
+
+    def invalidate(self):
+        # Drop every cached frame (e.g. after changing ENEMY_ROW_COLORS in place)
+        self.frames.clear()
+
+enemy_sprites = EnemySpriteCache()
+
+def render_power_up_frame(kind, radius):
+    # Render a power-up (coloured disc with its type's icon) centred on the sprite
+    x = y = POWER_UP_SPRITE_RADIUS
+    size = POWER_UP_SPRITE_RADIUS * 2 + 1
+    frame = pygame.Surface((size, size), pygame.SRCALPHA)
+    pygame.draw.circle(frame, POWER_UP_COLORS[kind], (x, y), radius)
+
+    # Draw an icon inside based on the power-up type
+    if kind == "speed":
+        # Draw lightning bolt
+        pygame.draw.line(frame, WHITE, (x - 5, y - 3), (x + 3, y + 3), 2)
+        pygame.draw.line(frame, WHITE, (x + 3, y + 3), (x - 3, y + 8), 2)
+    elif kind == "weapon":
+        # Draw crosshair
+        pygame.draw.circle(frame, WHITE, (x, y), 5, 1)
+        pygame.draw.line(frame, WHITE, (x - 8, y), (x + 8, y), 1)
+        pygame.draw.line(frame, WHITE, (x, y - 8), (x, y + 8), 1)
+    elif kind == "shield":
+        # Draw shield icon
+        pygame.draw.arc(frame, WHITE, (x - 5, y - 5, 10, 10), 0.5, 2.5, 2)
+    elif kind == "life":
+        # Draw heart
+        pygame.draw.circle(frame, WHITE, (x - 3, y - 2), 3)
+        pygame.draw.circle(frame, WHITE, (x + 3, y - 2), 3)
+        pygame.draw.polygon(frame, WHITE, [
+            (x - 6, y - 1),
+            (x, y + 5),
+            (x + 6, y - 1)
+        ])
+    return bake_colorkey(frame)
+
+class PowerUpSpriteCache:
+    # Pre-rendered power-ups, one per type and whole-pixel pulse radius
+    def __init__(self):
+        self.frames = {}
+
+    def get(self, kind, pulse_size):
+        key = (kind, int(10 + pulse_size))
+        frame = self.frames.get(key)
+        if frame is None:
+            frame = render_power_up_frame(*key)
+            self.frames[key] = frame
+        return frame
+
+    def invalidate(self):
+        self.frames.clear()
+
+power_up_sprites = PowerUpSpriteCache()
+
+class TextCache:
+    # Rendered text surfaces keyed by (font, text, colour). Antialiased font
+    # rendering is expensive and the HUD and menus draw the same strings every
+    # frame, so each one is rendered once and reused until it falls out of
+    # the cache (least recently used first).
+    def __init__(self, capacity=TEXT_CACHE_SIZE):
+        self.capacity = capacity
+        self.surfaces = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def render(self, font, text, color):
+        key = (font, text, color)
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.surfaces.move_to_end(key)
+            self.hits += 1
+            return surface
+
+        self.misses += 1
+        surface = font.render(text, True, color)
+        self.surfaces[key] = surface
+        if len(self.surfaces) > self.capacity:
+            self.surfaces.popitem(last=False)
+        return surface
+
+    def clear(self):
+        self.surfaces.clear()
+
+    def describe(self):
+        # Hit rate so far, for the profiler overlay
+        lookups = self.hits + self.misses
+        rate = self.hits / lookups * 100 if lookups else 0
+        return f"{rate:.0f}% hits, {self.misses} rendered, {len(self.surfaces)} kept"
+
+text_cache = TextCache()
+
+def format_countdown(milliseconds):
+    # Seconds left with one decimal, rounded down to whole tenths so the
+    # string only changes ten times a second (and stays in the text cache)
+    return f"{max(0, int(milliseconds) // 100) / 10:.1f}s"
+
+class ProfilerOverlay:
+    # Panel with the profiler's rolling mean/p95/max per stage and a
+    # histogram of frame work time (without the frame-cap wait). The panel
+    # is only rebuilt every PROFILE_OVERLAY_REFRESH frames, so the numbers
+    # stay readable and drawing it is a single blit the rest of the time.
+    # With a quality controller the current tier is listed at the bottom,
+    # followed by a line per source given to add_footer().
+    def __init__(self, profiler, font, budget_ms=1000 / 60, quality=None):
+        self.profiler = profiler
+        self.quality = quality
+        self.footers = []  # (label, source with a describe() method)
+        self.budget_ms = budget_ms  # Histogram bars past this are drawn red
+        self.font = font
+        self.panel = None
+        self.frames_until_refresh = 0
+
+    def add_footer(self, label, source):
+        # Show "label: source.describe()" under the histogram
+        self.footers.append((label, source))
+
+    def rebuild(self):
+        font = self.font
+        line_height = font.get_linesize()
+        rows = [("stage", "mean", "p95", "max ms")]
+        for stage, mean, p95, longest in self.profiler.stats():
+            rows.append((stage, f"{mean:.2f}", f"{p95:.2f}", f"{longest:.2f}"))
+        counts = self.profiler.histogram(PROFILE_HISTOGRAM_BUCKET, PROFILE_HISTOGRAM_BUCKETS)
+
+        column_x = [0, 115, 170, 225]
+        histogram_height = 50
+        width = 300
+        footer_lines = (1 if self.quality is not None else 0) + len(self.footers)
+        height = (len(rows) + 2 + footer_lines) * line_height + histogram_height + 10
+        # Translucent through per-pixel alpha, so it also blends correctly
+        # onto a transparent HUD layer
+        panel = pygame.Surface((width, height), pygame.SRCALPHA)
+        panel.fill((*BLACK, 190))
+        for row, fields in enumerate(rows):
+            for x, field in zip(column_x, fields):
+                # Rendered directly: the numbers change every rebuild and
+                # would only push the HUD strings out of the text cache
+                panel.blit(font.render(field, True, WHITE), (5 + x, 5 + row * line_height))
+
+        # Frame work time histogram
+        top = 5 + (len(rows) + 1) * line_height
+        panel.blit(font.render(f"frame work ({PROFILE_HISTOGRAM_BUCKET} ms bars)", True, YELLOW),
+                   (5, top - line_height))
+        bar_width = (width - 10) // PROFILE_HISTOGRAM_BUCKETS
+        most = max(counts) or 1
+        for i, count in enumerate(counts):
+            bar_height = histogram_height * count // most
+            color = GREEN if (i + 1) * PROFILE_HISTOGRAM_BUCKET <= self.budget_ms else RED
+            pygame.draw.rect(panel, color, (5 + i * bar_width, top + histogram_height - bar_height,
+                                            bar_width - 2, bar_height))
+        footers = [(label, source.describe()) for label, source in self.footers]
+        if self.quality is not None:
+            footers.insert(0, ("quality", self.quality.describe()))
+        for line, (label, description) in enumerate(footers):
+            panel.blit(font.render(f"{label}: {description}", True, YELLOW),
+                       (5, top + histogram_height + 5 + line * line_height))
+        self.panel = panel
+
+    def draw(self, surface):
+        # Draw the panel at the right edge below the HUD; returns its rect
+        if self.frames_until_refresh <= 0 or self.panel is None:
+            self.rebuild()
+            self.frames_until_refresh = PROFILE_OVERLAY_REFRESH
+        self.frames_until_refresh -= 1
+        return surface.blit(self.panel, (surface.get_width() - self.panel.get_width() - 10, 50))
+
+class FlipPresenter:
+    # Repaints the whole frame every time: clears to black, scrolls and draws
+    # the starfield, and flips the full display when the frame is done.
+    #
+    # Every presenter has a playfield surface for the Renderer to draw on;
+    # finish_playfield() puts it on the screen before the HUD is drawn. Here
+    # (and in DirtyRectPresenter) the playfield is the screen itself.
+    def __init__(self, surface, starfield):
+        self.surface = surface
+        self.playfield = surface
+        self.starfield = starfield
+
+    def begin_frame(self):
+        self.surface.fill(BLACK)
+        self.starfield.update()
+        self.starfield.draw(self.surface)
+
+    def finish_playfield(self):
+        pass
+
+    def present(self, rects):
+        pygame.display.flip()
+
+    def invalidate(self):
+        pass
+
+class DirtyRectPresenter:
+    # Only repaints what changed. The background (black with the starfield
+    # frozen in place) is drawn once. Each frame the rects drawn on last frame
+    # are restored from it, and only those plus this frame's rects are sent
+    # to the display. If they cover more than DIRTY_AREA_LIMIT of the screen
+    # a single full flip is cheaper, so that is used instead. The covered
+    # area is counted in tiles, so a sprite's old and new rects (which mostly
+    # overlap) are not counted twice.
+    def __init__(self, surface, starfield, area_limit=DIRTY_AREA_LIMIT):
+        self.surface = surface
+        self.playfield = surface
+        self.screen_rect = surface.get_rect()
+        tiles_x = -(-self.screen_rect.width // DIRTY_TILE_SIZE)
+        tiles_y = -(-self.screen_rect.height // DIRTY_TILE_SIZE)
+        self.tile_limit = int(area_limit * tiles_x * tiles_y)
+        self.background = pygame.Surface(self.screen_rect.size)
+        self.background.fill(BLACK)
+        starfield.draw(self.background)
+        self.background = display_format(self.background, alpha=False)
+        self.previous_rects = []
+        self.full_redraw = True
+        self.full_flips = 0  # Frames that fell back to a full flip
+        self.partial_updates = 0  # Frames sent as a rect list
+
+    def begin_frame(self):
+        if self.full_redraw:
+            self.surface.blit(self.background, (0, 0))
+            return
+        for rect in self.previous_rects:
+            self.surface.blit(self.background, rect, rect)
+
+    def finish_playfield(self):
+        pass
+
+    def present(self, rects):
+        screen_rect = self.screen_rect
+        rects = [screen_rect.clip(rect) for rect in rects if rect]
+        dirty = self.previous_rects + rects
+        if self.full_redraw or self.count_tiles(dirty) > self.tile_limit:
+            pygame.display.flip()
+            self.full_flips += 1
+        else:
+            pygame.display.update(dirty)
+            self.partial_updates += 1
+        self.previous_rects = rects
+        self.full_redraw = False
+
+    def describe(self):
+        # How frames were sent to the display, for the profiler overlay
+        return f"{self.partial_updates} partial, {self.full_flips} full flips"
+
+    def count_tiles(self, rects):
+        # Number of distinct DIRTY_TILE_SIZE tiles the rects touch
+        tiles = set()
+        for rect in rects:
+            if not rect:
+                continue
+            top = rect.top // DIRTY_TILE_SIZE
+            bottom = (rect.bottom - 1) // DIRTY_TILE_SIZE + 1
+            for tile_x in range(rect.left // DIRTY_TILE_SIZE, (rect.right - 1) // DIRTY_TILE_SIZE + 1):
+                tiles.update(range(tile_x * 1024 + top, tile_x * 1024 + bottom))
+        return len(tiles)
+
+    def invalidate(self):
+        # Something else drew over the whole screen; start the next frame afresh
+        self.full_redraw = True
+
+class ScaledPresenter:
+    # Draws the playfield (background, stars and everything the Renderer
+    # draws) on an off-screen surface at a fraction of the screen resolution
+    # and scales it up to the screen once per frame; the HUD is then drawn at
+    # full resolution. When filling pixels is the bottleneck (software
+    # rendering) the playfield costs roughly scale squared of a full-size one.
+    # smooth uses smoothscale for the upscale (softer, slower) instead of
+    # plain pixel doubling.
+    def __init__(self, surface, starfield, scale, smooth=False):
+        self.surface = surface
+        self.starfield = starfield
+        self.smooth = smooth
+        self.playfield = pygame.Surface((round(surface.get_width() * scale),
+                                         round(surface.get_height() * scale)))
+        self.playfield = display_format(self.playfield, alpha=False)
+
+    def begin_frame(self):
+        self.playfield.fill(BLACK)
+        self.starfield.update()
+        self.starfield.draw(self.playfield)
+
+    def finish_playfield(self):
+        # Scale straight onto the screen (no intermediate surface)
+        if self.smooth:
+            pygame.transform.smoothscale(self.playfield, self.surface.get_size(), self.surface)
+        else:
+            pygame.transform.scale(self.playfield, self.surface.get_size(), self.surface)
+
+    def present(self, rects):
+        pygame.display.flip()
+
+    def invalidate(self):
+        pass
+
+
+class Renderer:
+    # Draws a Game's playfield (player, enemies, bullets, particle effects and
+    # power-ups) onto a surface. Call handle_events() with the events from
+    # each simulation step so explosions appear where things happened.
+    #
+    # alpha is how far the frame sits between the last two simulation ticks
+    # (0 = previous tick, 1 = latest); moving objects are drawn interpolated.
+    # draw() returns the rects it drew on, for dirty-rect presentation, and
+    # reports each part of the drawing to the profiler (a no-op by default).
+    # Effects follow the quality tier given to set_quality().
+    #
+    # The game is always drawn in logical (SCREEN_WIDTH x SCREEN_HEIGHT)
+    # coordinates scaled to the surface's width, so it can render into a
+    # smaller off-screen playfield. Sprites are scaled once and cached.
+    #
+    # Every pixel goes through sprite(), draw_sprite(), draw_sprites(),
+    # draw_circle() and draw_particles(); a subclass can override those to
+    # draw somewhere other than a surface (surface is then None and the
+    # scale 1).
+    def __init__(self, surface, rng=None, profiler=None):
+        self.surface = surface
+        self.scale = surface.get_width() / SCREEN_WIDTH if surface is not None else 1.0
+        self.scaled_sprites = weakref.WeakKeyDictionary()  # Logical sprite -> sprite at self.scale
+        self.rng = rng if rng is not None else random.Random()
+        self.profiler = profiler if profiler is not None else NullProfiler()
+        self.engine_flicker = 0
+        self.animation_state = 0
+        self.animation_speed = 0.1
+        self.pulse_size = 0
+        self.pulse_direction = 1
+        # Thruster exhaust, tentacle drips and explosions share one particle pool
+        self.particles = ParticleSystem()
+        self.thruster_styles = [self.particles.style(color) for color in (ORANGE, YELLOW, RED)]
+        self.explosion_style = self.particles.style(ORANGE, YELLOW)
+        self.dirty_rects = []  # Rects drawn on by the current draw()
+        self.quality = QUALITY_TIERS[0]
+
+    def set_quality(self, tier):
+        self.quality = tier
+
+    def sprite(self, frame):
+        # A logical-size sprite at the render scale
+        if self.scale == 1:
+            return frame
+        scaled = self.scaled_sprites.get(frame)
+        if scaled is None:
+            size = (max(1, round(frame.get_width() * self.scale)),
+                    max(1, round(frame.get_height() * self.scale)))
+            colorkey = frame.get_colorkey()
+            if colorkey is not None:
+                # Smoothing would blend the key colour into the edges
+                scaled = pygame.transform.scale(frame, size)
+                scaled.set_colorkey(colorkey, pygame.RLEACCEL)
+            else:
+                scaled = pygame.transform.smoothscale(frame, size)
+            self.scaled_sprites[frame] = scaled
+        return scaled
+
+    def blit(self, frame, x, y):
+        # Draw a logical-size sprite with its top-left corner at logical (x, y)
+        scale = self.scale
+        return self.draw_sprite(self.sprite(frame), int(x * scale), int(y * scale))
+
+    def draw_sprite(self, sprite, x, y):
+        # Draw a sprite from sprite() at surface pixel (x, y); returns its rect
+        return self.surface.blit(sprite, (x, y))
+
+    def draw_sprites(self, blits):
+        # Draw a list of (sprite, (x, y)) in one batch; returns their rects
+        return self.surface.blits(blits)
+
+    def draw_circle(self, color, center, radius):
+        return pygame.draw.circle(self.surface, color, center, radius)
+
+    def draw_particles(self):
+        return self.particles.draw(self.surface, self.scale)
+
+    def reset(self):
+        # Forget the effects of the previous game
+        self.particles.clear()
+
+    def handle_events(self, events):
+        # Explosions are stationary orange particles with a yellow core
+        for kind, x, y, detail in events:
+            if kind == "enemy_destroyed" or kind == "player_hit":
+                self.particles.emit(x, y, 15, 15, self.explosion_style)
+            elif kind == "shield_hit":
+                self.particles.emit(x, y, 10, 10, self.explosion_style)
+            elif kind == "power_up":
+                # Collection effect
+                self.particles.emit(x, y, 15, 10, self.explosion_style)
+
+    def draw(self, game, alpha=1.0):
+        profiler = self.profiler
+        self.dirty_rects = []
+        self.draw_player(game.player, alpha)
+        profiler.lap("player_draw")
+        self.draw_enemy_group(game.enemy_group, alpha)
+        profiler.lap("enemy_draw")
+
+        # Draw every particle effect in one batch, then age them
+        self.dirty_rects.extend(self.draw_particles())
+        self.particles.update()
+        profiler.lap("particles")
+
+        # Draw power-ups
+        for power_up in game.enemy_group.power_ups:
+            self.draw_power_up(power_up, alpha)
+        profiler.lap("power_up_draw")
+        return self.dirty_rects
+
+    def draw_player(self, player, alpha=1.0):
+        rng = self.rng
+        dirty_rects = self.dirty_rects
+        x = player.prev_x + (player.x - player.prev_x) * alpha
+        y = player.y
+
+        # Draw shield effect if active
+        if player.has_shield:
+            # Semi-transparent pre-rendered shield around the player
+            shield_radius = max(player.width, player.height) + 15
+            dirty_rects.append(self.blit(player_sprites.get_shield(shield_radius, player.shield_alpha), 
+                                         x + player.width // 2 - shield_radius, 
+                                         y + player.height // 2 - shield_radius))
+
+        # Advance the engine flame animation
+        self.engine_flicker = (self.engine_flicker + 1) % 8
+        flame_height = 15 + self.engine_flicker
+        if player.has_speed_boost:
+            flame_height += 10  # Bigger flames if speed boost is active
+
+        # Draw the pre-rendered ship body and engine flames in a single blit
+        dirty_rects.append(self.blit(player_sprites.get_ship(player, self.engine_flicker), 
+                                     x - PLAYER_SPRITE_MARGIN_X, y - PLAYER_SPRITE_MARGIN_TOP))
+
+        # Add thruster particles (they shrink as they fade)
+        if rng.random() < 0.3 * self.quality["particle_rate"]:  # 30% chance each frame at full quality
+            # Left thruster
+            particle_x = x + 20 + rng.uniform(-5, 5)
+            particle_y = y + player.height + rng.uniform(0, flame_height)
+            particle_size = rng.uniform(1.5, 3)
+            particle_lifetime = rng.randint(10, 20)
+            particle_style = rng.choice(self.thruster_styles)
+            self.particles.emit(particle_x, particle_y, particle_size, particle_lifetime,
+                                particle_style, shrink=0.2)
+
+            # Right thruster
+            particle_x = x + player.width - 20 + rng.uniform(-5, 5)
+            particle_y = y + player.height + rng.uniform(0, flame_height)
+            particle_size = rng.uniform(1.5, 3)
+            particle_lifetime = rng.randint(10, 20)
+            particle_style = rng.choice(self.thruster_styles)
+            self.particles.emit(particle_x, particle_y, particle_size, particle_lifetime,
+                                particle_style, shrink=0.2)
+
+        # Draw bullets with different color if weapon upgrade is active
+        bullet_color = RED if player.has_weapon_upgrade else YELLOW
+        inner_color = ORANGE if player.has_weapon_upgrade else WHITE
+        glow_color = (255, 100, 100, 100) if player.has_weapon_upgrade else (255, 255, 100, 100)
+
+        # Stamp every bullet (glow plus core) in one batched blit, pulled back
+        # along its path to where it was at this point between ticks
+        stamp = self.sprite(bullet_stamps.get(glow_color, bullet_color, inner_color, self.quality["bullet_glow"]))
+        radius = stamp.get_rect().width // 2
+        scale = self.scale
+        offset_y = (1 - alpha) * player.bullet_speed
+        dirty_rects.extend(self.draw_sprites([(stamp, (int(bullet[0] * scale) - radius,
+                                                       int((bullet[1] + offset_y) * scale) - radius))
+                                              for bullet in player.bullets]))
+
+    def advance_enemy_animation(self):
+        # Animate the enemies by oscillating between states
+        self.animation_state = (self.animation_state + self.animation_speed) % 2
+
+        # Pulse animation for body size
+        if self.pulse_direction == 1:
+            self.pulse_size += 0.05
+            if self.pulse_size >= 1:
+                self.pulse_direction = -1
+        else:
+            self.pulse_size -= 0.05
+            if self.pulse_size <= -1:
+                self.pulse_direction = 1
+
+    def draw_enemy_group(self, enemy_group, alpha=1.0):
+        rng = self.rng
+        dirty_rects = self.dirty_rects
+        self.advance_enemy_animation()
+        glow = self.quality["enemy_glow"]
+        scale = self.scale
+        tentacle_chance = 0.02 * self.quality["particle_rate"]  # 2% per tentacle per frame at full quality
+
+        # Every enemy shares the animation phase, so each row's frame is looked up once
+        row_frames = {}
+        pulse_width = enemy_group.enemy_width + self.pulse_size * 2
+        pulse_height = enemy_group.enemy_height + self.pulse_size * 2
+        tentacle_count = 5
+        tentacle_spacing = pulse_width / (tentacle_count + 1)
+        tentacle_base_height = 8 + 4 * math.sin(self.animation_state * math.pi * 2)
+
+        # Positions come straight from the formation origin and alive mask
+        origin_x = enemy_group.origin_x
+        origin_y = enemy_group.origin_y
+        for row, col in enemy_group.live_slots():
+            enemy_x = origin_x + col * ENEMY_SPACING
+            enemy_y = origin_y + row * ENEMY_SPACING
+            color, glow_color = ENEMY_ROW_COLORS[min(row, len(ENEMY_ROW_COLORS) - 1)]
+            frame = row_frames.get(row)
+            if frame is None:
+                frame = self.sprite(enemy_sprites.get(color, glow_color, enemy_group.enemy_width,
+                                                      enemy_group.enemy_height, self.pulse_size,
+                                                      self.animation_state, glow))
+                row_frames[row] = frame
+
+            # Draw the pre-rendered glow, body, eyes and tentacles in a single blit
+            dirty_rects.append(self.draw_sprite(frame, int((enemy_x - ENEMY_SPRITE_MARGIN) * scale),
+                                                int((enemy_y - ENEMY_SPRITE_MARGIN) * scale)))
+
+            # Add tentacle particles occasionally (they drip down and shrink)
+            for i in range(tentacle_count):
+                if rng.random() < tentacle_chance:
+                    x_pos = enemy_x + (i + 1) * tentacle_spacing
+                    wave_offset = 3 * math.sin(self.animation_state * math.pi * 2 + i)
+                    tentacle_height = tentacle_base_height + i % 3 * 2
+                    particle_x = x_pos + wave_offset
+                    particle_y = enemy_y + pulse_height + tentacle_height
+                    particle_size = rng.uniform(1, 2)
+                    particle_lifetime = rng.randint(5, 15)
+                    particle_style = self.particles.style(glow_color)
+                    self.particles.emit(particle_x, particle_y, particle_size, particle_lifetime,
+                                        particle_style, dy=0.5, shrink=0.1)
+
+        # Draw enemy bullets (without their tail on the plain-bullet tiers)
+        offset_y = (alpha - 1) * enemy_group.bullet_speed
+        body_radius = max(1, round(3 * scale))
+        if not self.quality["bullet_glow"]:
+            dirty_rects.extend(self.draw_circle(RED, (int(bullet[0] * scale), int((bullet[1] + offset_y) * scale)),
+                                                body_radius)
+                               for bullet in enemy_group.bullets)
+            return
+        tail_radius = max(1, round(scale))
+        for bullet in enemy_group.bullets:
+            # Draw a more interesting bullet (small red circle with a tail)
+            bullet_x = int(bullet[0] * scale)
+            bullet_y = bullet[1] + offset_y
+            body = self.draw_circle(RED, (bullet_x, int(bullet_y * scale)), body_radius)
+            tail = self.draw_circle(YELLOW, (bullet_x, int((bullet_y - 5) * scale)), tail_radius)
+            dirty_rects.append(body.union(tail))
+
+    def draw_power_up(self, power_up, alpha=1.0):
+        x = power_up.x
+        y = power_up.prev_y + (power_up.y - power_up.prev_y) * alpha
+
+        # Draw the pre-rendered power-up at its current pulse in a single blit
+        frame = power_up_sprites.get(power_up.type, power_up.pulse_size)
+        self.dirty_rects.append(self.blit(frame, x - POWER_UP_SPRITE_RADIUS, y - POWER_UP_SPRITE_RADIUS))
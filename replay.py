@@ -0,0 +1,117 @@
+# Input recording and deterministic replay.
+#
+# A game is fully determined by its seed, its tick rate and the input given
+# to each tick, so that is all a recording holds: a small header and one
+# byte per tick (left/right/fire bits), with a marker byte wherever the game
+# was restarted. Pauses and transitions need no record, because the game
+# clock only moves when the game ticks.
+#
+# Replay a recording headlessly, as fast as the CPU allows:
+#     python replay.py session.rep
+import argparse
+import struct
+import time
+
+from simulation import Game
+
+REPLAY_MAGIC = b"SIRP"
+REPLAY_VERSION = 3  # Bumped whenever a rules change makes old recordings play out differently
+REPLAY_HEADER = struct.Struct("<4sBHQ")  # Magic, version, tick rate, seed
+MAX_TICK_RATE = 2 ** 16 - 1  # Largest tick rate and seed the header can hold
+MAX_SEED = 2 ** 64 - 1
+
+# Input byte layout
+INPUT_LEFT = 1
+INPUT_RIGHT = 2
+INPUT_FIRE = 4
+INPUT_RESET = 0x80  # The game was reset before the next tick
+
+class InputRecorder:
+    # Collects the input of every tick of a session
+    def __init__(self, seed, tick_rate):
+        self.seed = seed
+        self.tick_rate = tick_rate
+        self.inputs = bytearray()
+
+    def record(self, move_left, move_right, fire):
+        self.inputs.append((INPUT_LEFT if move_left else 0) |
+                           (INPUT_RIGHT if move_right else 0) |
+                           (INPUT_FIRE if fire else 0))
+
+    def record_reset(self):
+        self.inputs.append(INPUT_RESET)
+
+    def save(self, path):
+        with open(path, "wb") as output:
+            output.write(REPLAY_HEADER.pack(REPLAY_MAGIC, REPLAY_VERSION, self.tick_rate, self.seed))
+            output.write(self.inputs)
+
+class Replay:
+    # Feeds a recording back into a game one tick at a time
+    def __init__(self, seed, tick_rate, inputs):
+        self.seed = seed
+        self.tick_rate = tick_rate
+        self.inputs = inputs
+        self.position = 0
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as replay_file:
+            data = replay_file.read()
+        if len(data) < REPLAY_HEADER.size:
+            raise ValueError(f"{path} is not a replay file")
+        magic, version, tick_rate, seed = REPLAY_HEADER.unpack_from(data)
+        if magic != REPLAY_MAGIC:
+            raise ValueError(f"{path} is not a replay file")
+        if version != REPLAY_VERSION:
+            raise ValueError(f"{path} is a version {version} replay; only version {REPLAY_VERSION} is supported")
+        return cls(seed, tick_rate, data[REPLAY_HEADER.size:])
+
+    def new_game(self, profiler=None):
+        # A game set up the way the recorded one started
+        return Game(tick_rate=self.tick_rate, seed=self.seed, profiler=profiler)
+
+    def finished(self):
+        return self.position >= len(self.inputs)
+
+    def next_is_reset(self):
+        return not self.finished() and self.inputs[self.position] == INPUT_RESET
+
+    def skip_reset(self):
+        # Consume a reset marker the caller has carried out itself
+        if self.next_is_reset():
+            self.position += 1
+
+    def step(self, game):
+        # Carry out any resets, then step the game with the next tick's
+        # input. Returns the (left, right, fire) used, or None once the
+        # recording has run out (the game is not stepped).
+        while self.next_is_reset():
+            game.reset()
+            self.position += 1
+        if self.finished():
+            return None
+        value = self.inputs[self.position]
+        self.position += 1
+        move_left = bool(value & INPUT_LEFT)
+        move_right = bool(value & INPUT_RIGHT)
+        fire = bool(value & INPUT_FIRE)
+        game.step(move_left, move_right, fire)
+        return move_left, move_right, fire
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay a recorded game headlessly")
+    parser.add_argument("replay", help="recording made with main.py --record")
+    args = parser.parse_args()
+
+    replay = Replay.load(args.replay)
+    game = replay.new_game()
+    ticks = 0
+    start = time.perf_counter()
+    while replay.step(game) is not None:
+        game.drain_events()
+        ticks += 1
+    elapsed = time.perf_counter() - start
+    print(f"{ticks} ticks in {elapsed:.2f}s ({ticks / max(elapsed, 1e-9):.0f} ticks/s), "
+          f"level {game.current_level}, score {game.player.score}, lives {game.player.lives}"
+          f"{', game over' if game.game_over else ''}")
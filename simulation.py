@@ -0,0 +1,876 @@
+# Game simulation: player, enemy waves, collisions and level progression.
+#
+# Nothing in here touches pygame or the display. The game advances in fixed
+# ticks on its own GameClock, and all randomness comes from per-subsystem
+# generators derived from one seed (RandomStreams), so a game can be stepped
+# headlessly and reproduced exactly from its seed and inputs. Drawing lives
+# in render.py.
+import argparse
+import math
+import random
+import time
+
+from arrays import DEFAULT_STORAGE, np
+from profiler import NullProfiler
+
+# Array storage for bullets and the alive mask (see arrays.py). The default
+# is NumPy when it is installed; callers that step many small games one by
+# one, such as env.VectorEnv, switch to plain arrays with use_storage().
+storage = DEFAULT_STORAGE
+
+def use_storage(policy):
+    # Make policy the storage of the games created from now on
+    global storage
+    storage = policy
+
+# Constants (speeds and chances are per step at BASE_TICK_RATE)
+BASE_TICK_RATE = 60  # Steps per second the game was tuned for
+SCREEN_WIDTH = 1280
+SCREEN_HEIGHT = 720
+PLAYER_SPEED = 8
+ENEMY_SPEED = 3
+BULLET_SPEED = 10
+ENEMY_BULLET_SPEED = 5
+ENEMY_SHOOT_CHANCE = 0.001  # 0.1% chance per frame
+ENEMY_ROWS = 5
+ENEMY_COLS = 10
+ENEMY_SPACING = 80
+ENEMY_DROP = 40
+ENEMY_MOVE_TIME = 1000  # milliseconds between enemy movements
+SHOT_COOLDOWN = 300  # milliseconds between player shots
+POWER_UP_DURATION = 10000  # 10 seconds
+PLAYER_BULLET_CAPACITY = 64  # Initial bullet store sizes (they grow when full)
+ENEMY_BULLET_CAPACITY = 128
+POWER_UP_CELL_SIZE = 80  # Bucket size of the power-up spatial hash
+ENEMY_WIDTH = 60
+ENEMY_HEIGHT = 45
+
+class GameClock:
+    # Simulation time in milliseconds. It only moves when the game ticks, so
+    # slow frames, pauses and blocking screens never eat into game timers.
+    def __init__(self, tick_rate=BASE_TICK_RATE):
+        self.tick_rate = tick_rate
+        self.tick_ms = 1000 / tick_rate
+        self.time = 0
+        self.ticks = 0
+        self.paused = False
+
+    def tick(self):
+        # Advance by one fixed step (ignored while paused)
+        if not self.paused:
+            self.time += self.tick_ms
+            self.ticks += 1
+
+    def pause(self):
+        self.paused = True
+
+    def resume(self):
+        self.paused = False
+
+    def get_ticks(self):
+        return self.time
+
+class RandomStreams:
+    # Independent random generators per subsystem ("enemy_fire", "power_ups",
+    # "renderer", ...), all derived from one seed. Because every subsystem
+    # draws from its own stream, a change in how often one of them rolls
+    # (say, more particles on screen) does not shift what the others get,
+    # so a seed and an input log replay the same game.
+    def __init__(self, seed):
+        self.seed = seed
+        self.streams = {}
+
+    def get(self, name):
+        rng = self.streams.get(name)
+        if rng is None:
+            rng = self.streams[name] = random.Random(f"{self.seed}/{name}")
+        return rng
+
+class BulletStore:
+    # Bullets kept as contiguous x/y arrays (NumPy, or array('f') without it)
+    # instead of a list of [x, y] lists. Moving and culling is one pass over
+    # the arrays, and single removals swap the last bullet into the hole.
+    # The arrays come from the module's storage policy when the store is
+    # created.
+    def __init__(self, capacity):
+        self.count = 0
+        self.storage = storage
+        self.vectorised = storage.vectorised
+        self.xs = storage.allocate(capacity)
+        self.ys = storage.allocate(capacity)
+
+    def __len__(self):
+        return self.count
+
+    def __iter__(self):
+        return iter(self.positions())
+
+    def positions(self):
+        # Snapshot of the live bullets as (x, y) tuples
+        if self.vectorised:
+            return list(zip(self.xs[:self.count].tolist(), self.ys[:self.count].tolist()))
+        return list(zip(self.xs[:self.count], self.ys[:self.count]))
+
+    def add(self, x, y):
+        if self.count == len(self.xs):
+            # Out of room: double the capacity
+            self.xs = self.storage.grow(self.xs)
+            self.ys = self.storage.grow(self.ys)
+        self.xs[self.count] = x
+        self.ys[self.count] = y
+        self.count += 1
+
+    def remove(self, index):
+        # Swap-remove: move the last bullet into the freed slot
+        last = self.count - 1
+        self.xs[index] = self.xs[last]
+        self.ys[index] = self.ys[last]
+        self.count = last
+
+    def clear(self):
+        self.count = 0
+
+    def advance(self, dy, min_y, max_y):
+        # Move every bullet vertically by dy and drop those outside [min_y, max_y]
+        count = self.count
+        if self.vectorised:
+            ys = self.ys[:count]
+            ys += dy
+            keep = (ys >= min_y) & (ys <= max_y)
+            if not keep.all():
+                kept = np.flatnonzero(keep)
+                self.count = len(kept)
+                self.xs[:self.count] = self.xs[kept]
+                self.ys[:self.count] = ys[kept]
+            return
+
+        # Pure Python fallback: compact the survivors towards the front
+        xs, ys = self.xs, self.ys
+        write = 0
+        for read in range(count):
+            y = ys[read] + dy
+            if min_y <= y <= max_y:
+                xs[write] = xs[read]
+                ys[write] = y
+                write += 1
+        self.count = write
+
+    def first_inside(self, left, top, right, bottom):
+        # Index of the first bullet inside the rectangle (edges included), or -1
+        count = self.count
+        if self.vectorised:
+            xs = self.xs[:count]
+            ys = self.ys[:count]
+            hits = np.flatnonzero((xs >= left) & (xs <= right) & (ys >= top) & (ys <= bottom))
+            return int(hits[0]) if len(hits) else -1
+
+        xs, ys = self.xs, self.ys
+        for i in range(count):
+            if left <= xs[i] <= right and top <= ys[i] <= bottom:
+                return i
+        return -1
+
+class SpatialHash:
+    # Uniform grid of buckets for free-moving objects such as power-ups. Items
+    # are bucketed by their bounding box; queries only look at the buckets a
+    # rectangle overlaps and return candidates in insertion order.
+    def __init__(self, cell_size):
+        self.cell_size = cell_size
+        self.cells = {}
+        self.entries = {}  # id(item) -> (insertion order, item, bucket keys)
+        self.next_order = 0
+
+    def _cell_keys(self, left, top, right, bottom):
+        size = self.cell_size
+        return [(cx, cy)
+                for cx in range(int(left // size), int(right // size) + 1)
+                for cy in range(int(top // size), int(bottom // size) + 1)]
+
+    def clear(self):
+        self.cells.clear()
+        self.entries.clear()
+        self.next_order = 0
+
+    def insert(self, item, left, top, right=None, bottom=None):
+        # A point can be inserted by leaving out right/bottom
+        right = left if right is None else right
+        bottom = top if bottom is None else bottom
+        keys = self._cell_keys(left, top, right, bottom)
+        for key in keys:
+            self.cells.setdefault(key, []).append(item)
+        self.entries[id(item)] = (self.next_order, item, keys)
+        self.next_order += 1
+
+    def remove(self, item):
+        entry = self.entries.pop(id(item), None)
+        if entry is None:
+            return
+        for key in entry[2]:
+            bucket = self.cells[key]
+            bucket.remove(item)
+            if not bucket:
+                del self.cells[key]
+
+    def query(self, left, top, right, bottom):
+        found = {}
+        for key in self._cell_keys(left, top, right, bottom):
+            for item in self.cells.get(key, ()):
+                found[id(item)] = item
+        return sorted(found.values(), key=lambda item: self.entries[id(item)][0])
+
+
+class Player:
+    def __init__(self, tick_scale=1.0):
+        self.width = 80
+        self.height = 50
+        self.x = SCREEN_WIDTH // 2 - self.width // 2
+        self.y = SCREEN_HEIGHT - self.height - 30
+        self.prev_x = self.x  # Position before the last step, for render interpolation
+        self.tick_scale = tick_scale  # Fraction of a base tick covered by one step
+        self.speed = PLAYER_SPEED
+        self.bullet_speed = BULLET_SPEED * tick_scale
+        self.bullets = BulletStore(PLAYER_BULLET_CAPACITY)
+        self.lives = 3
+        self.score = 0
+        # Power-up effects
+        self.has_shield = False
+        self.shield_time = 0
+        self.has_speed_boost = False
+        self.speed_boost_time = 0
+        self.has_weapon_upgrade = False
+        self.weapon_upgrade_time = 0
+        self.shield_alpha = 128  # For shield transparency
+
+    def move(self, direction):
+        if direction == "left" and self.x > 0:
+            self.x -= self.speed * self.tick_scale
+        if direction == "right" and self.x < SCREEN_WIDTH - self.width:
+            self.x += self.speed * self.tick_scale
+
+    def shoot(self):
+        # Base bullet position
+        bullet_y = self.y - 10
+
+        if self.has_weapon_upgrade:
+            # Triple shot when weapon upgrade is active
+            self.bullets.add(self.x + self.width // 2 - 1.5, bullet_y)  # Center bullet
+            self.bullets.add(self.x + 10, bullet_y)                     # Left bullet
+            self.bullets.add(self.x + self.width - 10, bullet_y)        # Right bullet
+        else:
+            # Single bullet
+            bullet_x = self.x + self.width // 2 - 1.5
+            self.bullets.add(bullet_x, bullet_y)
+
+    def update_bullets(self):
+        # Move bullets up and remove those that go off screen
+        self.bullets.advance(-self.bullet_speed, 0, float("inf"))
+
+    def update_power_ups(self, current_time):
+        # Update power-up timers and deactivate expired power-ups
+
+        # Shield power-up
+        if self.has_shield and current_time > self.shield_time:
+            self.has_shield = False
+
+        # Speed boost power-up
+        if self.has_speed_boost and current_time > self.speed_boost_time:
+            self.has_speed_boost = False
+            self.speed = PLAYER_SPEED  # Reset speed to normal
+
+        # Weapon upgrade power-up
+        if self.has_weapon_upgrade and current_time > self.weapon_upgrade_time:
+            self.has_weapon_upgrade = False
+
+        # Make shield pulse for visual effect
+        if self.has_shield:
+            self.shield_alpha = 128 + int(30 * math.sin(current_time / 200))
+
+class Enemy:
+    # A view of one formation slot. Enemies hold no position of their own:
+    # it follows from the group's origin, so moving the formation never
+    # touches them. Views are made on demand and compare equal when they
+    # refer to the same slot of the same group.
+    __slots__ = ("group", "row", "col")
+    width = ENEMY_WIDTH
+    height = ENEMY_HEIGHT
+
+    def __init__(self, group, row, col):
+        self.group = group
+        self.row = row
+        self.col = col  # Column in the formation grid
+
+    @property
+    def x(self):
+        return self.group.origin_x + self.col * ENEMY_SPACING
+
+    @property
+    def y(self):
+        return self.group.origin_y + self.row * ENEMY_SPACING
+
+    def __eq__(self, other):
+        return (isinstance(other, Enemy) and self.group is other.group and
+                self.row == other.row and self.col == other.col)
+
+    def __hash__(self):
+        return hash((id(self.group), self.row, self.col))
+
+class PowerUp:
+    def __init__(self, x, y, rng=random, tick_scale=1.0):
+        self.x = x
+        self.y = y
+        self.prev_y = y  # Position before the last step, for render interpolation
+        self.tick_scale = tick_scale
+        self.width = 20
+        self.height = 20
+        self.speed = 2
+        # Randomly choose a power-up type
+        self.type = rng.choice(["speed", "weapon", "shield", "life"])
+        self.pulse_size = 0
+        self.pulse_direction = 1
+
+    def update(self):
+        # Move down
+        self.prev_y = self.y
+        self.y += self.speed * self.tick_scale
+
+        # Pulse animation
+        if self.pulse_direction == 1:
+            self.pulse_size += 0.2 * self.tick_scale
+            if self.pulse_size >= 5:
+                self.pulse_direction = -1
+        else:
+            self.pulse_size -= 0.2 * self.tick_scale
+            if self.pulse_size <= 0:
+                self.pulse_direction = 1
+
+class EnemyGroup:
+    # rng decides when enemies fire; power_up_rng decides power-up drops.
+    def __init__(self, rows=ENEMY_ROWS, cols=ENEMY_COLS, clock=None, rng=None, power_up_rng=None):
+        self.clock = clock if clock is not None else GameClock()
+        self.rng = rng if rng is not None else random.Random()
+        self.power_up_rng = power_up_rng if power_up_rng is not None else random.Random()
+        self.tick_scale = BASE_TICK_RATE / self.clock.tick_rate
+        self.bullet_speed = ENEMY_BULLET_SPEED * self.tick_scale
+        self.bullets = BulletStore(ENEMY_BULLET_CAPACITY)
+        self.power_ups = []   # List to store power-ups
+        self.power_up_index = SpatialHash(POWER_UP_CELL_SIZE)  # Power-ups bucketed by position
+        self.direction = 1  # 1 for right, -1 for left
+        self.drop_flag = False
+        self.last_move_time = self.clock.get_ticks()
+        self.speed = ENEMY_SPEED
+        self.shoot_chance = ENEMY_SHOOT_CHANCE
+        # Enemy fire is scheduled rather than rolled per enemy: the countdown
+        # is a unit exponential that every tick drains by the formation's
+        # fire rate, and a shot is fired whenever it runs out
+        self.fire_countdown = self.rng.expovariate(1.0)
+
+        # Calculate total width and height of enemy grid
+        total_width = cols * ENEMY_SPACING
+        total_height = rows * ENEMY_SPACING
+
+        # Calculate starting positions to center the grid both horizontally and vertically
+        start_x = (SCREEN_WIDTH - total_width) // 2
+        start_y = (SCREEN_HEIGHT - total_height) // 3  # Position in the top third of the screen
+
+        # The formation is a grid of slots that moves as one body: slot
+        # (row, col) always sits at origin + (col, row) * ENEMY_SPACING, so a
+        # formation step only moves the origin. Which slots still hold a live
+        # enemy is a row-major alive mask (one byte per slot; with NumPy
+        # storage, alive_grid is a 2D view of the same bytes for whole-grid queries).
+        # The row doubles as the enemy type (its colours and score event).
+        self.origin_x = start_x
+        self.origin_y = start_y
+        self.rows = rows
+        self.cols = cols
+        self.alive = bytearray(b"\x01" * (rows * cols))
+        self.alive_grid = storage.grid(self.alive, rows, cols)
+        self.count = rows * cols  # Live enemies
+
+        # All enemies share one size, which bounds how many slots can contain a point
+        self.enemy_width = ENEMY_WIDTH
+        self.enemy_height = ENEMY_HEIGHT
+
+        # Formation frontier, kept up to date by kill(): the lowest living row
+        # of each column (-1 once the column is empty), the outermost columns
+        # with anyone left in them and the lowest living row overall. With
+        # these the edge, reached-the-player and shooter queries never have
+        # to look at every enemy.
+        self.bottom_rows = [rows - 1] * cols if rows else [-1] * cols
+        self.first_col = 0 if rows else cols
+        self.last_col = cols - 1 if rows else -1
+        self.last_row = rows - 1 if cols else -1
+
+    def move(self):
+        current_time = self.clock.get_ticks()
+        # Move enemies at regular intervals
+        if current_time - self.last_move_time > ENEMY_MOVE_TIME:
+            self.last_move_time = current_time
+
+            # Check if the formation would hit the edge
+            move_down = False
+            if self.count:
+                if self.direction > 0:
+                    move_down = self.right_edge() + self.speed > SCREEN_WIDTH
+                else:
+                    move_down = self.left_edge() - self.speed < 0
+
+            # Move the formation (every enemy moves with its origin)
+            if move_down:
+                self.origin_y += ENEMY_DROP
+            else:
+                self.origin_x += self.speed * self.direction
+
+            # Change direction if needed
+            if move_down:
+                self.direction *= -1
+
+    def shoot(self):
+        # Each living enemy used to fire with probability shoot_chance per
+        # step, i.e. count * shoot_chance shots per step on average.
+        # Firing as a Poisson process at that same rate keeps the average
+        # while costing O(1) per step instead of a random roll per enemy.
+        # Kills change the rate straight away, since the countdown is drained
+        # at whatever the rate is on each step.
+        self.fire_countdown -= self.count * self.shoot_chance * self.tick_scale
+        while self.fire_countdown <= 0 and self.count:
+            # Like the arcade original, only the lowest enemy of a column fires
+            enemy = self.rng.choice(self.bottom_enemies())
+            bullet_x = enemy.x + enemy.width // 2 - 1.5
+            bullet_y = enemy.y + enemy.height
+            self.bullets.add(bullet_x, bullet_y)
+            self.fire_countdown += self.rng.expovariate(1.0)
+
+    @property
+    def enemies(self):
+        # Views of the live enemies in row-major order (built on each access;
+        # use count, live_slots() or the frontier where they will do)
+        return [Enemy(self, row, col) for row, col in self.live_slots()]
+
+    def live_slots(self):
+        # (row, col) of every live enemy in row-major order
+        if self.alive_grid is not None:
+            rows, cols = np.nonzero(self.alive_grid)
+            return list(zip(rows.tolist(), cols.tolist()))
+        width = self.cols
+        return [divmod(index, width) for index, alive in enumerate(self.alive) if alive]
+
+    def bottom_enemies(self):
+        # The lowest living enemy of every column that has one
+        return [Enemy(self, row, col)
+                for col, row in enumerate(self.bottom_rows[self.first_col:self.last_col + 1],
+                                          self.first_col)
+                if row >= 0]
+
+    # Edges of the living formation's bounding box (only meaningful while
+    # there are enemies left)
+    def left_edge(self):
+        return self.origin_x + self.first_col * ENEMY_SPACING
+
+    def right_edge(self):
+        return self.origin_x + self.last_col * ENEMY_SPACING + self.enemy_width
+
+    def bottom_edge(self):
+        return self.origin_y + self.last_row * ENEMY_SPACING + self.enemy_height
+
+    def update_bullets(self):
+        # Move bullets down and remove those that go off screen
+        self.bullets.advance(self.bullet_speed, float("-inf"), SCREEN_HEIGHT)
+
+    def enemy_at(self, x, y):
+        # Find the enemy whose rectangle contains (x, y) in O(1): only the slots
+        # whose column/row span can reach the point are checked, in the same
+        # row-major order as the enemies list
+        if not self.count:
+            return None
+        rel_x = x - self.origin_x
+        rel_y = y - self.origin_y
+        first_row = max(0, math.ceil((rel_y - self.enemy_height) / ENEMY_SPACING))
+        last_row = min(self.rows - 1, math.floor(rel_y / ENEMY_SPACING))
+        first_col = max(0, math.ceil((rel_x - self.enemy_width) / ENEMY_SPACING))
+        last_col = min(self.cols - 1, math.floor(rel_x / ENEMY_SPACING))
+        alive = self.alive
+        for row in range(first_row, last_row + 1):
+            enemy_y = self.origin_y + row * ENEMY_SPACING
+            if y < enemy_y or y > enemy_y + self.enemy_height:
+                continue
+            for col in range(first_col, last_col + 1):
+                enemy_x = self.origin_x + col * ENEMY_SPACING
+                if (alive[row * self.cols + col] and
+                    x >= enemy_x and x <= enemy_x + self.enemy_width):
+                    return Enemy(self, row, col)
+        return None
+
+    def kill(self, enemy):
+        # Clear an enemy's slot in the alive mask
+        row, col = enemy.row, enemy.col
+        self.alive[row * self.cols + col] = 0
+        self.count -= 1
+
+        # Update the frontier: only a column's lowest enemy moves it
+        bottom_rows = self.bottom_rows
+        if row != bottom_rows[col]:
+            return
+        if self.alive_grid is not None:
+            above = np.flatnonzero(self.alive_grid[:row, col])
+            row = int(above[-1]) if len(above) else -1
+        else:
+            row -= 1
+            while row >= 0 and not self.alive[row * self.cols + col]:
+                row -= 1
+        bottom_rows[col] = row
+        if enemy.row == self.last_row:
+            self.last_row = max(bottom_rows)
+        if row < 0:
+            # The column is empty; the outer columns may have to move in
+            while self.first_col <= self.last_col and bottom_rows[self.first_col] < 0:
+                self.first_col += 1
+            while self.last_col >= self.first_col and bottom_rows[self.last_col] < 0:
+                self.last_col -= 1
+
+    def add_power_up(self, power_up):
+        self.power_ups.append(power_up)
+        self.power_up_index.insert(power_up, power_up.x, power_up.y)
+
+    def remove_power_up(self, power_up):
+        self.power_ups.remove(power_up)
+        self.power_up_index.remove(power_up)
+
+    def update_power_ups(self):
+        # Update power-ups and remove those that go off screen
+        for power_up in self.power_ups[:]:
+            power_up.update()
+            if power_up.y > SCREEN_HEIGHT:
+                self.power_ups.remove(power_up)
+
+        # Re-bucket the power-ups at their new positions
+        self.power_up_index.clear()
+        for power_up in self.power_ups:
+            self.power_up_index.insert(power_up, power_up.x, power_up.y)
+
+def check_collisions(player, enemy_group, enemies_killed=None, events=None):
+    # Effects the renderer and audio should react to are reported as
+    # (kind, x, y, detail) tuples appended to events
+    if events is None:
+        events = []
+
+    # Check player bullets hitting enemies
+    hit_bullets = []
+    for index, bullet in enumerate(player.bullets.positions()):
+        enemy = enemy_group.enemy_at(bullet[0], bullet[1])
+        if enemy is None:
+            continue
+
+        # Report the explosion at the enemy's centre
+        explosion_x = enemy.x + enemy.width // 2
+        explosion_y = enemy.y + enemy.height // 2
+        events.append(("enemy_destroyed", explosion_x, explosion_y, enemy.row))
+
+        # Chance to spawn a power-up (20% probability)
+        if enemy_group.power_up_rng.random() < 0.2:
+            power_up = PowerUp(explosion_x, explosion_y, enemy_group.power_up_rng, enemy_group.tick_scale)
+            enemy_group.add_power_up(power_up)
+
+        # Remove enemy and update score
+        enemy_group.kill(enemy)
+        player.score += 10
+
+        # Increment enemies killed counter if provided
+        if enemies_killed is not None:
+            enemies_killed[0] += 1
+
+        hit_bullets.append(index)
+
+    # Remove bullets that hit an enemy (highest index first, so swap-removal
+    # never moves a bullet that still has to be removed)
+    for index in reversed(hit_bullets):
+        player.bullets.remove(index)
+
+    # Check enemy bullets hitting player
+    index = enemy_group.bullets.first_inside(player.x, player.y,
+                                             player.x + player.width, player.y + player.height)
+    if index >= 0:
+        bullet = (float(enemy_group.bullets.xs[index]), float(enemy_group.bullets.ys[index]))
+        # Remove the bullet
+        enemy_group.bullets.remove(index)
+
+        # If player has shield, don't lose a life
+        if player.has_shield:
+            events.append(("shield_hit", bullet[0], bullet[1], None))
+        else:
+            # Reduce player lives
+            player.lives -= 1
+            events.append(("player_hit", bullet[0], bullet[1], None))
+
+    # Check player collecting power-ups
+    current_time = enemy_group.clock.get_ticks()
+
+    nearby_power_ups = enemy_group.power_up_index.query(player.x, player.y,
+                                                         player.x + player.width, player.y + player.height)
+    for power_up in nearby_power_ups:
+        # Check if player collides with power-up
+        if (power_up.x >= player.x and power_up.x <= player.x + player.width and
+            power_up.y >= player.y and power_up.y <= player.y + player.height):
+
+            # Apply power-up effect based on type
+            if power_up.type == "speed":
+                player.has_speed_boost = True
+                player.speed_boost_time = current_time + POWER_UP_DURATION
+                player.speed = PLAYER_SPEED * 1.5  # 50% speed boost
+
+            elif power_up.type == "weapon":
+                player.has_weapon_upgrade = True
+                player.weapon_upgrade_time = current_time + POWER_UP_DURATION
+
+            elif power_up.type == "shield":
+                player.has_shield = True
+                player.shield_time = current_time + POWER_UP_DURATION
+
+            elif power_up.type == "life":
+                player.lives += 1  # Extra life
+
+            events.append(("power_up", power_up.x, power_up.y, power_up.type))
+
+            # Remove the collected power-up
+            enemy_group.remove_power_up(power_up)
+            break
+
+    # Check if enemies reached the player's level
+    if enemy_group.count and enemy_group.bottom_edge() >= player.y:
+        return True  # Game over
+
+    return False  # Game continues
+
+class Difficulty:
+    # The level progression parameters, so balance changes can be tried
+    # without editing Game (see tune.py). The defaults are the shipped
+    # tuning; pass overrides by name, e.g. Difficulty(shoot_chance_cap=0.003).
+    def __init__(self, **overrides):
+        # Level 1
+        self.start_rows = ENEMY_ROWS
+        self.start_cols = ENEMY_COLS
+        self.start_shoot_chance = ENEMY_SHOOT_CHANCE
+        self.restart_shoot_chance = 0.002  # Level 1 of every game after the first (game over or menu)
+        self.first_level_kills = 20  # Enemies to kill to leave level 1
+
+        # On each level up: kills needed = kills_base + kills_per_sqrt_level * sqrt(level)
+        self.kills_base = 15
+        self.kills_per_sqrt_level = 10
+        # rows/cols = base + int(sqrt(level)), capped
+        self.rows_base = 3
+        self.max_rows = 8
+        self.cols_base = 8
+        self.max_cols = 12
+        # shoot chance = shoot_chance_base + shoot_chance_per_log * log2(level + 1), capped
+        self.shoot_chance_base = 0.001
+        self.shoot_chance_per_log = 0.0003
+        self.shoot_chance_cap = 0.004
+        # speed = ENEMY_SPEED + speed_per_log * log2(level + 1)
+        self.speed_per_log = 0.5
+
+        # On each cleared wave (values scaled by log2(level + 1))
+        self.wave_speed_per_log = 0.1
+        self.wave_shoot_chance_per_log = 0.0001
+
+        for name, value in overrides.items():
+            if not hasattr(self, name):
+                raise ValueError(f"Unknown difficulty parameter: {name}")
+            # An override keeps the type of the default it replaces (a whole
+            # number may stand in for a fractional one)
+            default = getattr(self, name)
+            expected = (int, float) if isinstance(default, float) else type(default)
+            if isinstance(value, bool) or not isinstance(value, expected):
+                raise ValueError(f"Difficulty parameter {name} must be {type(default).__name__}, "
+                                 f"not {type(value).__name__}")
+            setattr(self, name, value)
+
+class Game:
+    # One play session: the player, the current enemy wave and level
+    # progression. Drive it by calling step() once per fixed tick with the
+    # player's input; what happened during the step is collected in events.
+    # Each stage of a step is reported to the profiler (a no-op by default).
+    # Without a seed a random one is picked; it is kept in self.seed so the
+    # game can be replayed. Level progression follows difficulty (the
+    # shipped tuning by default). The game plays out the same whichever
+    # storage policy its arrays come from (see use_storage()). Pass a clock
+    # to drive the game on a GameClock shared with the caller; its tick rate
+    # then replaces tick_rate.
+    def __init__(self, tick_rate=BASE_TICK_RATE, seed=None, profiler=None, difficulty=None, clock=None):
+        self.clock = clock if clock is not None else GameClock(tick_rate)
+        self.difficulty = difficulty if difficulty is not None else Difficulty()
+        self.profiler = profiler if profiler is not None else NullProfiler()
+        self.tick_ms = self.clock.tick_ms
+        self.tick_scale = BASE_TICK_RATE / self.clock.tick_rate
+        self.seed = seed if seed is not None else random.randrange(2 ** 32)
+        self.rngs = RandomStreams(self.seed)
+        self.events = []
+        self.games_started = 0
+        self.reset()
+
+    def reset(self):
+        # Start again from level 1 (a restart fires harder than the first game)
+        difficulty = self.difficulty
+        self.enemy_rows = difficulty.start_rows
+        self.enemy_cols = difficulty.start_cols
+        if self.games_started:
+            self.shoot_chance = difficulty.restart_shoot_chance
+        else:
+            self.shoot_chance = difficulty.start_shoot_chance
+        self.games_started += 1
+        self.player = Player(self.tick_scale)
+        self.enemy_group = self.new_wave()
+        self.game_over = False
+        self.current_level = 1
+        self.enemies_killed = 0
+        self.enemies_to_next_level = difficulty.first_level_kills  # Number of enemies to kill to advance to next level
+        self.last_shot_time = None
+        self.events.clear()
+
+    def new_wave(self):
+        enemy_group = EnemyGroup(self.enemy_rows, self.enemy_cols, self.clock,
+                                 self.rngs.get("enemy_fire"), self.rngs.get("power_ups"))
+        enemy_group.shoot_chance = self.shoot_chance
+        return enemy_group
+
+    def drain_events(self):
+        # Hand over the events collected since the last call
+        events = self.events
+        self.events = []
+        return events
+
+    def pause(self):
+        self.clock.pause()
+
+    def resume(self):
+        self.clock.resume()
+
+    def step(self, move_left=False, move_right=False, fire=False):
+        # Advance the game by one tick
+        if self.game_over or self.clock.paused:
+            return
+
+        player = self.player
+        player.prev_x = player.x
+        current_time = self.clock.get_ticks()
+
+        # Shoot, respecting the cooldown between shots
+        if fire and (self.last_shot_time is None or
+                     current_time - self.last_shot_time > SHOT_COOLDOWN):
+            player.shoot()
+            self.events.append(("shot", player.x + player.width // 2, player.y, None))
+            self.last_shot_time = current_time
+
+        # Continuous movement
+        if move_left:
+            player.move("left")
+        if move_right:
+            player.move("right")
+
+        # Update game state
+        player.update_bullets()
+        player.update_power_ups(current_time)
+        profiler = self.profiler
+        profiler.lap("player")
+        self.enemy_group.move()
+        profiler.lap("enemy_move")
+        self.enemy_group.shoot()
+        profiler.lap("enemy_shoot")
+        self.enemy_group.update_bullets()
+        self.enemy_group.update_power_ups()
+        profiler.lap("bullets")
+
+        # Check collisions
+        # Pass enemies_killed as a list to allow it to be modified by reference
+        enemies_killed_ref = [self.enemies_killed]
+        self.game_over = check_collisions(player, self.enemy_group, enemies_killed_ref, self.events)
+        self.enemies_killed = enemies_killed_ref[0]
+
+        # Check if player should advance to next level
+        if self.enemies_killed >= self.enemies_to_next_level:
+            self.level_up()
+
+        # Check if player lost all lives
+        if player.lives <= 0:
+            self.game_over = True
+
+        # Check if all enemies are destroyed
+        if self.enemy_group.count == 0:
+            self.clear_wave()
+
+        self.clock.tick()
+        profiler.lap("collisions")
+
+    def level_up(self):
+        self.current_level += 1
+        self.enemies_killed = 0
+        current_level = self.current_level
+        difficulty = self.difficulty
+
+        # More balanced scaling formula for enemies needed to level up
+        # Uses square root function to make scaling more gradual at higher levels
+        self.enemies_to_next_level = int(difficulty.kills_base + difficulty.kills_per_sqrt_level * math.sqrt(current_level))
+
+        # Adjust the enemy rows and columns based on level
+        # This will create more enemies as the level increases
+
+        # Increase rows and columns gradually with level, but cap at reasonable values
+        # to prevent the game from becoming too crowded or too difficult
+        self.enemy_rows = min(difficulty.max_rows, difficulty.rows_base + int(math.sqrt(current_level)))
+        self.enemy_cols = min(difficulty.max_cols, difficulty.cols_base + int(math.sqrt(current_level)))
+
+        # More balanced shoot chance scaling - logarithmic with a reasonable cap
+        # This makes early levels easier and prevents later levels from becoming impossible
+        self.shoot_chance = min(difficulty.shoot_chance_cap,
+                                difficulty.shoot_chance_base +
+                                difficulty.shoot_chance_per_log * math.log(current_level + 1, 2))
+
+        # Create a new wave of enemies with increased difficulty
+        self.enemy_group = self.new_wave()
+
+        # More balanced speed scaling - logarithmic to prevent it from becoming too fast
+        # Base speed + logarithmic increase based on level
+        self.enemy_group.speed = ENEMY_SPEED + difficulty.speed_per_log * math.log(current_level + 1, 2)
+
+        self.events.append(("level_up", 0, 0, current_level))
+
+    def clear_wave(self):
+        # Create a new wave of enemies
+        difficulty = self.difficulty
+        self.enemy_group = self.new_wave()
+        # Increase difficulty slightly (less than level progression)
+        # Use a small logarithmic increase to keep it balanced
+        self.enemy_group.speed += difficulty.wave_speed_per_log * math.log(self.current_level + 1, 2)
+        # Slightly increase enemy shoot chance (but less than level progression)
+        # Use a small logarithmic increase to keep it balanced
+        self.shoot_chance = min(difficulty.shoot_chance_cap,
+                                self.shoot_chance +
+                                difficulty.wave_shoot_chance_per_log * math.log(self.current_level + 1, 2))
+        self.enemy_group.shoot_chance = self.shoot_chance
+
+        self.events.append(("wave_cleared", 0, 0, self.current_level))
+
+def run_headless(ticks, seed=0, fire_every=10):
+    # Play a game for a number of ticks with a simple scripted player that
+    # sweeps across the screen and fires continuously
+    game = Game(seed=seed)
+    direction = 1
+    for tick in range(ticks):
+        if game.game_over:
+            game.reset()
+        player = game.player
+        if player.x <= 0 or player.x >= SCREEN_WIDTH - player.width:
+            direction = -direction
+        game.step(direction < 0, direction > 0, tick % fire_every == 0)
+        game.drain_events()
+    return game
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the game simulation headlessly")
+    parser.add_argument("--ticks", type=int, default=10000, help="simulation steps to run")
+    parser.add_argument("--seed", type=int, default=0, help="random seed")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    game = run_headless(args.ticks, args.seed)
+    elapsed = time.perf_counter() - start
+    print(f"{args.ticks} ticks in {elapsed:.2f}s ({args.ticks / elapsed:.0f} ticks/s), "
+          f"level {game.current_level}, score {game.player.score}")
@@ -0,0 +1,10 @@
+# Surface helpers shared by the renderer and the particle system.
+import pygame
+
+def display_format(surface, alpha=True):
+    # The surface converted to the display's pixel format for fast blits
+    # (convert_alpha, or convert for opaque surfaces); unchanged until a
+    # display exists
+    if pygame.display.get_surface() is None:
+        return surface
+    return surface.convert_alpha() if alpha else surface.convert()
@@ -0,0 +1,183 @@
+# Optional texture backend: the game drawn through SDL2's render API
+# (pygame._sdl2.video) instead of blitting surfaces on the CPU.
+#
+# Every sprite the surface renderer blits (ship, shield, aliens, bullet and
+# particle stamps, power-ups, stars) is already pre-rendered by the caches in
+# render.py; here each one is uploaded to a texture on first use and drawn
+# with a texture copy. The SDL renderer is created with accelerated=-1, so
+# SDL picks a GPU driver (OpenGL, Direct3D, Metal) where there is one and its
+# software renderer otherwise; the game runs either way.
+#
+# Menus, the HUD and transitions keep drawing with pygame onto an off-screen
+# screen surface. During play that surface is a transparent HUD layer: only
+# the rects drawn on it each frame are uploaded and composited over the
+# playfield. The menus fill it and show it whole with show_screen().
+#
+# Without pygame._sdl2 (or when SDL cannot create a renderer) main.py keeps
+# the surface renderer.
+import weakref
+
+import pygame
+
+from particles import render_particle_stamp
+from render import STAR_SPEED_BANDS, Renderer
+from simulation import SCREEN_HEIGHT
+
+try:
+    from pygame._sdl2.video import Window, Renderer as SDLRenderer, Texture
+except ImportError:
+    Window = None
+
+BLENDMODE_BLEND = 1  # SDL_BLENDMODE_BLEND: alpha blending for sprites and the HUD layer
+TRANSPARENT = (0, 0, 0, 0)
+
+def texture_backend_available():
+    return Window is not None
+
+class TextureDisplay:
+    # The window, its SDL renderer and the off-screen screen surface that
+    # stand in for pygame.display. Raises pygame.error if SDL cannot create
+    # either.
+    def __init__(self, title, size):
+        self.window = Window(title, size)
+        self.renderer = SDLRenderer(self.window, accelerated=-1)
+        self.screen = pygame.Surface(size, pygame.SRCALPHA)
+        self.screen.fill(TRANSPARENT)
+        self.screen_rect = self.screen.get_rect()
+        self.screen_texture = Texture(self.renderer, size, streaming=True)
+        self.screen_texture.blend_mode = BLENDMODE_BLEND
+        self.textures = weakref.WeakKeyDictionary()  # Sprite surface -> its texture
+
+    def texture(self, surface):
+        # The texture of a sprite, uploaded on first use
+        texture = self.textures.get(surface)
+        if texture is None:
+            texture = Texture.from_surface(self.renderer, surface)
+            texture.blend_mode = BLENDMODE_BLEND
+            self.textures[surface] = texture
+        return texture
+
+    def show_screen(self):
+        # Put the whole screen surface on the window (the menus' flip)
+        self.renderer.draw_color = (0, 0, 0, 255)
+        self.renderer.clear()
+        self.screen_texture.update(self.screen)
+        self.screen_texture.draw()
+        self.renderer.present()
+
+class TexturePresenter:
+    # The presenter for the texture backend: begin_frame() clears the window
+    # and draws the starfield (one star stamp per star), present() lays the
+    # HUD layer's rects over the playfield and shows the frame.
+    #
+    # The HUD layer (surface, main.py's screen) is kept transparent apart
+    # from the current frame's HUD: the rects drawn on last frame are cleared
+    # at the start of the next. Overlapping rects are merged so translucent
+    # pixels are not blended twice.
+    def __init__(self, display, starfield):
+        self.display = display
+        self.surface = display.screen
+        self.playfield = None  # The TextureRenderer draws straight to the window
+        self.starfield = starfield
+        self.previous_rects = []
+        self.full_clear = True
+        # Per parallax layer: (texture, x, y) of each star's top-left corner
+        stamps = {}
+        self.star_layers = [[] for _ in STAR_SPEED_BANDS]
+        for x, y, size, color, layer in starfield.stars:
+            stamp = stamps.get((color, size))
+            if stamp is None:
+                stamp = stamps[color, size] = render_particle_stamp(color, None, 0, size)
+            self.star_layers[layer].append((display.texture(stamp), x - size, y - size, size * 2 + 1))
+        self.star_stamps = list(stamps.values())  # Keeps the textures cached
+
+    def begin_frame(self):
+        renderer = self.display.renderer
+        renderer.draw_color = (0, 0, 0, 255)
+        renderer.clear()
+        if self.full_clear:
+            self.surface.fill(TRANSPARENT)
+            self.full_clear = False
+        else:
+            for rect in self.previous_rects:
+                self.surface.fill(TRANSPARENT, rect)
+
+        starfield = self.starfield
+        starfield.update()
+        first = len(self.star_layers) - starfield.visible_layers
+        for stars, offset in zip(self.star_layers[first:], starfield.offsets[first:]):
+            offset = int(offset)
+            for texture, x, y, size in stars:
+                y = (y + offset) % SCREEN_HEIGHT
+                texture.draw(dstrect=(x, y))
+                # Stars on the seam show at both ends
+                if y + size > SCREEN_HEIGHT:
+                    texture.draw(dstrect=(x, y - SCREEN_HEIGHT))
+
+    def finish_playfield(self):
+        pass
+
+    def present(self, rects):
+        screen_rect = self.display.screen_rect
+        merged = []
+        for rect in rects:
+            if not rect:
+                continue
+            rect = screen_rect.clip(rect)
+            index = rect.collidelist(merged)
+            while index != -1:
+                rect = rect.union(merged.pop(index))
+                index = rect.collidelist(merged)
+            if rect:
+                merged.append(rect)
+
+        hud = self.display.screen_texture
+        for rect in merged:
+            hud.update(self.surface.subsurface(rect), rect)
+            hud.draw(srcrect=rect, dstrect=rect)
+        self.display.renderer.present()
+        self.previous_rects = merged
+
+    def invalidate(self):
+        # The menus drew over the whole screen surface; clear it all next frame
+        self.full_clear = True
+
+class TextureRenderer(Renderer):
+    # render.Renderer drawing sprites as textures on the display's SDL
+    # renderer (always at full resolution). draw() returns no rects: the
+    # playfield never touches the HUD layer, so there is nothing for the
+    # presenter to upload.
+    def __init__(self, display, rng=None, profiler=None):
+        super().__init__(None, rng, profiler)
+        self.display = display
+        self.circles = {}  # (color, radius) -> circle stamp, keeping its texture cached
+
+    def sprite(self, frame):
+        return self.display.texture(frame)
+
+    def draw_sprite(self, sprite, x, y):
+        sprite.draw(dstrect=(x, y))
+        return pygame.Rect(x, y, sprite.width, sprite.height)
+
+    def draw_sprites(self, blits):
+        rects = []
+        for sprite, position in blits:
+            sprite.draw(dstrect=position)
+            rects.append(pygame.Rect(position, (sprite.width, sprite.height)))
+        return rects
+
+    def draw_circle(self, color, center, radius):
+        stamp = self.circles.get((color, radius))
+        if stamp is None:
+            stamp = self.circles[color, radius] = render_particle_stamp(color, None, 0, radius)
+        return self.draw_sprite(self.display.texture(stamp), center[0] - radius, center[1] - radius)
+
+    def draw_particles(self):
+        texture = self.display.texture
+        for stamp, position in self.particles.stamps_at():
+            texture(stamp).draw(dstrect=position)
+        return []
+
+    def draw(self, game, alpha=1.0):
+        super().draw(game, alpha)
+        return []
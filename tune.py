@@ -0,0 +1,259 @@
+# Monte Carlo difficulty tuning: play many seeded headless games with
+# scripted policies under candidate level-progression parameters and compare
+# how long the games last, the level they reach and the score.
+#
+# Parameter sets come from a JSON file mapping a set name to Difficulty
+# overrides (an empty object is the shipped tuning):
+#     {"baseline": {}, "gentler": {"shoot_chance_cap": 0.003, "kills_base": 12}}
+#
+#     python tune.py --sets sets.json --policies tracker sweeper --games 1000 --output runs.jsonl
+#
+# Games are spread over a process pool and every finished game is appended
+# to the output file (one JSON object per line) straight away. Run the same
+# command again to resume an interrupted sweep: games already in the file
+# are skipped. Every set plays the same seeds, so sets are compared on
+# identical enemy fire and power-up drops. The summary is printed at the
+# end, or on its own with --summary-only.
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import time
+from collections import Counter
+
+from profiler import summarize
+from simulation import SCREEN_WIDTH, BASE_TICK_RATE, ENEMY_SPACING, Difficulty, Game
+
+MAX_GAME_SECONDS = 20 * 60  # A game is cut off after 20 minutes of game time
+DODGE_DISTANCE = 160  # How far above the player the tracker watches for bullets
+
+class SweeperPolicy:
+    # Sweeps from wall to wall, firing every few ticks (as run_headless does).
+    # rng picks the first direction and where in the firing cycle it starts.
+    def __init__(self, rng, fire_every=10):
+        self.direction = rng.choice((-1, 1))
+        self.fire_every = fire_every
+        self.ticks = rng.randrange(fire_every)
+
+    def act(self, game):
+        player = game.player
+        if player.x <= 0 or player.x >= SCREEN_WIDTH - player.width:
+            self.direction = -self.direction
+        self.ticks += 1
+        return self.direction < 0, self.direction > 0, self.ticks % self.fire_every == 0
+
+class RandomPolicy:
+    # Holds a random input for a random number of ticks
+    def __init__(self, rng):
+        self.rng = rng
+        self.inputs = (False, False, False)
+        self.hold = 0
+
+    def act(self, game):
+        if self.hold <= 0:
+            self.inputs = (self.rng.random() < 0.4, self.rng.random() < 0.4, self.rng.random() < 0.5)
+            self.hold = self.rng.randint(5, 30)
+        self.hold -= 1
+        return self.inputs
+
+class TrackerPolicy:
+    # Steps out from under enemy bullets that are about to land, otherwise
+    # moves under the nearest column that still has enemies, firing all the
+    # time. rng breaks ties: which way to dodge a bullet heading for the
+    # middle of the ship (kept until that bullet is dodged), and which of two
+    # equally near columns to take.
+    def __init__(self, rng):
+        self.rng = rng
+        self.dodge = None  # (bullet x, go left) of the last tied dodge
+
+    def act(self, game):
+        player = game.player
+        enemy_group = game.enemy_group
+        centre = player.x + player.width / 2
+        step = player.speed * player.tick_scale  # How far one step moves the ship
+
+        # Dodge the nearest threatening bullet
+        threat = None
+        for x, y in enemy_group.bullets.positions():
+            if (player.x - 10 <= x <= player.x + player.width + 10 and
+                    player.y - DODGE_DISTANCE <= y <= player.y + player.height):
+                if threat is None or y > threat[1]:
+                    threat = (x, y)
+        if threat is not None:
+            # Step away from it, unless that runs into a wall
+            if abs(threat[0] - centre) < step:
+                if self.dodge is None or self.dodge[0] != threat[0]:
+                    self.dodge = (threat[0], self.rng.random() < 0.5)
+                go_left = self.dodge[1]
+            else:
+                go_left = threat[0] > centre
+            if go_left and player.x <= 0:
+                go_left = False
+            elif not go_left and player.x >= SCREEN_WIDTH - player.width:
+                go_left = True
+            return go_left, not go_left, True
+
+        # Line up under the nearest column that still has enemies
+        target = None
+        column_offset = enemy_group.origin_x + enemy_group.enemy_width / 2
+        for col, row in enumerate(enemy_group.bottom_rows):
+            if row >= 0:
+                x = column_offset + col * ENEMY_SPACING
+                if (target is None or abs(x - centre) < abs(target - centre) or
+                        (abs(x - centre) == abs(target - centre) and self.rng.random() < 0.5)):
+                    target = x
+        if target is None:
+            return False, False, True
+        return target < centre - step, target > centre + step, True
+
+POLICIES = {
+    "sweeper": SweeperPolicy,
+    "random": RandomPolicy,
+    "tracker": TrackerPolicy,
+}
+
+def play(task):
+    # Play one game to the end (or max_ticks); runs in a pool worker
+    set_name, parameters, policy_name, seed, max_ticks, tick_rate = task
+    game = Game(tick_rate=tick_rate, seed=seed, difficulty=Difficulty(**parameters))
+    policy = POLICIES[policy_name](random.Random(f"{seed}/policy"))
+    ticks = 0
+    while not game.game_over and ticks < max_ticks:
+        game.step(*policy.act(game))
+        game.events.clear()
+        ticks += 1
+    player = game.player
+    if not game.game_over:
+        outcome = "time"  # Still alive at max_ticks
+    elif player.lives <= 0:
+        outcome = "lives"
+    else:
+        outcome = "invaded"  # The formation reached the player
+    return {
+        "set": set_name,
+        "policy": policy_name,
+        "seed": seed,
+        "parameters": parameters,
+        "tick_rate": tick_rate,
+        "max_ticks": max_ticks,
+        "seconds": ticks / tick_rate,
+        "level": game.current_level,
+        "score": player.score,
+        "outcome": outcome,
+    }
+
+def load_results(path):
+    # Every record in a results file (a partly written last line is ignored)
+    results = []
+    if not os.path.exists(path):
+        return results
+    with open(path) as results_file:
+        for line in results_file:
+            try:
+                results.append(json.loads(line))
+            except json.JSONDecodeError:
+                pass
+    return results
+
+def result_key(set_name, parameters, policy_name, seed, max_ticks, tick_rate):
+    # Identifies a game: results from other tick rates or cut-offs (or from
+    # files written before those were recorded) never stand in for it
+    return set_name, json.dumps(parameters, sort_keys=True), policy_name, seed, max_ticks, tick_rate
+
+def record_key(result):
+    # result_key() of a record read back from a results file
+    return result_key(result["set"], result["parameters"], result["policy"], result["seed"],
+                      result.get("max_ticks"), result.get("tick_rate"))
+
+def run(sets, policies, games, first_seed, max_ticks, tick_rate, output, workers):
+    done = {record_key(result) for result in load_results(output)}
+    wanted = [(set_name, parameters, policy_name, seed, max_ticks, tick_rate)
+              for set_name, parameters in sets.items()
+              for policy_name in policies
+              for seed in range(first_seed, first_seed + games)]
+    tasks = [task for task in wanted if result_key(*task) not in done]
+    if not tasks:
+        print(f"All {len(wanted)} games are already in {output}")
+        return
+    print(f"Playing {len(tasks)} games ({len(wanted) - len(tasks)} already in {output}) on {workers} processes")
+
+    # An interrupted run can leave a partly written last line; start on a
+    # fresh line so the first new record is not glued onto it (and lost)
+    torn_tail = False
+    if os.path.exists(output) and os.path.getsize(output):
+        with open(output, "rb") as existing:
+            existing.seek(-1, os.SEEK_END)
+            torn_tail = existing.read(1) != b"\n"
+
+    start = time.perf_counter()
+    finished = 0
+    with open(output, "a") as results_file, multiprocessing.Pool(workers) as pool:
+        if torn_tail:
+            results_file.write("\n")
+        for result in pool.imap_unordered(play, tasks, chunksize=4):
+            results_file.write(json.dumps(result) + "\n")
+            results_file.flush()
+            finished += 1
+            if finished % 100 == 0 or finished == len(tasks):
+                elapsed = time.perf_counter() - start
+                print(f"  {finished}/{len(tasks)} games, {finished / elapsed:.1f} games/s")
+
+def summary(results):
+    # Distributions per (set, policy), one block each
+    groups = {}
+    for result in results:
+        groups.setdefault((result["set"], result["policy"]), []).append(result)
+    lines = []
+    for (set_name, policy_name), group in sorted(groups.items()):
+        lines.append(f"{set_name} / {policy_name}: {len(group)} games")
+        for label, field in (("survival s", "seconds"), ("level", "level"), ("score", "score")):
+            values = sorted(result[field] for result in group)
+            mean, p95, worst = summarize(values)
+            lines.append(f"  {label:<11} mean {mean:>9.1f}  p10 {values[len(values) // 10]:>8g}  "
+                         f"median {values[len(values) // 2]:>8g}  p95 {p95:>8g}  max {worst:>8g}")
+        levels = Counter(result["level"] for result in group)
+        lines.append("  levels      " + "  ".join(f"{level}: {count}" for level, count in sorted(levels.items())))
+        outcomes = Counter(result["outcome"] for result in group)
+        lines.append("  ended by    " + "  ".join(f"{outcome}: {count}" for outcome, count in sorted(outcomes.items())))
+    return "\n".join(lines)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare difficulty parameter sets over many headless games")
+    parser.add_argument("--sets", metavar="PATH",
+                        help="JSON file of parameter sets (default: only the shipped tuning)")
+    parser.add_argument("--policies", nargs="+", choices=sorted(POLICIES), default=["tracker"],
+                        help="scripted players to run every set with")
+    parser.add_argument("--games", type=int, default=200, help="games per set and policy")
+    parser.add_argument("--first-seed", type=int, default=0, help="seed of the first game")
+    parser.add_argument("--max-ticks", type=int,
+                        help=f"ticks after which a game is cut off (default: {MAX_GAME_SECONDS // 60} minutes "
+                             "at the tick rate)")
+    parser.add_argument("--tick-rate", type=int, default=BASE_TICK_RATE, help="simulation steps per second")
+    parser.add_argument("--workers", type=int, default=multiprocessing.cpu_count(), help="worker processes")
+    parser.add_argument("--output", default="tuning.jsonl", help="results file (appended to, for resuming)")
+    parser.add_argument("--summary-only", action="store_true",
+                        help="only summarise the results already in the output file")
+    args = parser.parse_args()
+
+    if args.sets:
+        with open(args.sets) as sets_file:
+            sets = json.load(sets_file)
+    else:
+        sets = {"baseline": {}}
+    for set_name, parameters in sets.items():
+        try:
+            Difficulty(**parameters)
+        except ValueError as error:
+            parser.error(f"parameter set {set_name}: {error}")
+
+    max_ticks = args.max_ticks or MAX_GAME_SECONDS * args.tick_rate
+
+    if not args.summary_only:
+        run(sets, args.policies, args.games, args.first_seed, max_ticks,
+            args.tick_rate, args.output, args.workers)
+    # Only the sets asked for, with their current parameters, tick rate and cut-off
+    results = [result for result in load_results(args.output)
+               if sets.get(result["set"]) == result["parameters"] and
+               result.get("tick_rate") == args.tick_rate and result.get("max_ticks") == max_ticks]
+    print(summary(results))